@@ -1,25 +1,43 @@
+import time
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils.google_sheets import read_sheet_to_dataframe
+from utils.config import RESULTS_PAGE_SIZE
+from utils.prefetch import prefetch
+from utils.schema import frame_footprint
+from utils.cronograma import load_cronograma, refresh_cronograma
+from utils.filters import SORT_COLUMNS
+from utils.cards import CARD_CSS, render_cards
+from utils.pagination import page_bounds, page_sizes, remember, restore
+from utils.metrics import start_exporters
+from utils.write_queue import get_write_queue
+from utils.debug_panel import debug_enabled, render_debug_panel
+from utils.users import get_user_directory
+from utils.sessions import end_session, ensure_session, start_session
 from auth2 import authenticate_user, append_user_to_sheet
 
-# --- Constantes ---
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1VZpV97NIhd16jAyzMpVE_8VhSs-bSqi4DXmySsx2Kc4/edit#gid=0"
-USERS_SHEET = "Usuários"
-WORKSHEET_NAME = "Cronograma"
 
+# Início desta execução (painel de depuração) e exportação de métricas
+run_started = time.time()
+start_exporters()
+# Fila de escrita: reenvia o journal de edições pendentes desde a partida
+get_write_queue()
 
 # --- Sessão ---
 if "logged_in" not in st.session_state:
     st.session_state["logged_in"] = False
+# Recarga da página ou nova aba: restaura o login pelo cookie da sessão, sem ler o Sheets
+ensure_session()
 
-# --- Lê dados da planilha ---
-df_users = read_sheet_to_dataframe(SPREADSHEET_URL, USERS_SHEET)
+# --- Leituras em paralelo: Cronograma (sempre) e Usuários (só na tela de login) ---
+cronograma_future = prefetch("cronograma", load_cronograma)
+if not st.session_state["logged_in"]:
+    users_future = prefetch("usuarios", get_user_directory)
 
 # --- Autenticação ---
 if not st.session_state["logged_in"]:
     st.title("🔐 Portal de Acesso")
+    users = users_future.result()
     modo = st.radio("Escolha uma opção:", ["Login", "Cadastrar Novo Usuário"])
 
     if modo == "Login":
@@ -27,14 +45,15 @@ if not st.session_state["logged_in"]:
         senha = st.text_input("Senha", type="password")
 
         if st.button("🔓 Entrar"):
-            user_info = authenticate_user(login, senha, df_users)
+            user_info = authenticate_user(login, senha, users)
             if user_info:
                 st.session_state["logged_in"] = True
                 st.session_state["user_info"] = user_info
                 st.session_state["email"] = user_info["Email"]
                 st.session_state["tipo_usuario"] = user_info["Tipo de Usuário"]
+                start_session(user_info)
                 st.success(f"Bem-vindo, {user_info['Login']}!")
-                st.experimental_rerun()
+                st.rerun()
             else:
                 st.error("❌ Login ou senha inválidos.")
 
@@ -47,7 +66,7 @@ if not st.session_state["logged_in"]:
             submit = st.form_submit_button("✅ Cadastrar")
 
             if submit:
-                if novo_login in df_users['Login'].values:
+                if novo_login in users:
                     st.warning("⚠️ Este login já existe.")
                 else:
                     data = datetime.today().strftime("%Y-%m-%d %H:%M:%S")
@@ -61,10 +80,15 @@ st.title("📅 Painel de Cronograma PPR")
 st.write(f"👋 Bem-vindo, **{user_info['Login']}** ({user_info['Email']})")
 st.write("Tipo de usuário:", user_info["Tipo de Usuário"])
 
+# --- Painel de andamento (gestores) ---
+if user_info["Tipo de Usuário"] == "Gestor | Avaliador" and st.button("📊 Andamento das entregas"):
+    st.switch_page("pages/Dashboard.py")
+
 # --- Botão de logout ---
 if st.button("🚪 Sair"):
+    end_session()
     st.session_state.clear()
-    st.experimental_rerun()
+    st.rerun()
 
 
 if 'sidebar_visible' not in st.session_state:
@@ -91,6 +115,7 @@ st.markdown("""
         .card:hover {
             transform: translateY(-2px);
         }
+    """ + CARD_CSS + """
         .status-box {
             border-left: 4px solid #40b049;
             padding-left: 10px;
@@ -148,167 +173,120 @@ with user_info:
         st.markdown(f"<div class='subheader-style'>🔑 Tipo: {st.session_state.get('tipo_usuario', 'Não definido')}</div>", unsafe_allow_html=True)
     with cols[3]:
         if st.button("🔄 Atualizar", help="Atualizar dados da planilha"):
-            st.cache_data.clear()
-            st.rerun()
+            wait = refresh_cronograma(st.session_state["user_info"]["Login"])
+            if wait:
+                st.toast(f"Dados atualizados há pouco. Tente de novo em {wait:.0f}s.")
+            else:
+                st.rerun()
 
 # Carrega os dados
-@st.cache_data(ttl=300)
+debug_info = {}
+SORT_NONE = "Ordem da planilha"
+SEARCH_ICONS = {"Descrição Meta": "📑", "Responsável": "👤", "E-mail": "📧"}
+
 def load_data():
-    df = read_sheet_to_dataframe(SPREADSHEET_URL, WORKSHEET_NAME)
-    
-    # Verifica se o usuário está logado e filtra pelo e-mail
-    if "email" in st.session_state:
-        user_email = str(st.session_state.email).strip().lower()
+    """Motor de filtros do Cronograma compartilhado e a chave (e-mail) do usuário"""
+    # Leitura já disparada no início do script
+    filters = cronograma_future.result()
+    if filters.frame is not None and debug_enabled():
+        footprint = frame_footprint(filters.frame)
+        debug_info["Cronograma em cache"] = f"{footprint['total'] / 1024 ** 2:.2f} MB ({len(filters.frame)} linhas)"
 
-        #APLICAR LÓGICA DE FILTRO
-        df = df[df['E-mail'] == user_email]
-    
-    return df
+    # Verifica se o usuário está logado: só as linhas do seu e-mail (índice de partição)
+    user_key = st.session_state.email if "email" in st.session_state else None
+    return filters, user_key
 
-df = load_data()
+filters, user_key = load_data()
+df = filters.frame
 
 if df is not None:
     # --- SEÇÃO DE FILTROS DINÂMICOS ---
     with st.expander("🔍 Filtros Avançados", expanded=True):
         with st.container():
             st.markdown("<div class='filter-box'>", unsafe_allow_html=True)
-            
-            # Função auxiliar para opções de filtro
-            def get_filter_options(column, base_df):
-                options = base_df[column].unique()
-                return ["Todos"] + sorted(filter(None, set(str(x) for x in options)))
+
+            # Busca por meta, responsável ou e-mail; o resultado escolhido vira um filtro
+            selections = {}
+            query = st.text_input("🔎 Buscar", placeholder="Meta, responsável ou e-mail", key="search_query")
+            if query.strip():
+                matches = filters.search(query, user_key)
+                if matches:
+                    found = st.selectbox(
+                        "Resultados da busca",
+                        matches,
+                        index=None,
+                        format_func=lambda m: f"{SEARCH_ICONS.get(m.column, '')} {m.value}",
+                        placeholder=f"{len(matches)} resultados: escolha um para filtrar"
+                    )
+                    if found is not None:
+                        selections[found.column] = found.value
+                else:
+                    st.caption("Nenhum resultado para a busca.")
 
             # Layout dos filtros (3 colunas)
             col1, col2, col3 = st.columns(3)
-            
-            # Dicionário para armazenar seleções
-            selections = {}
-            
-            with col1:
-                selections['Referência'] = st.selectbox(
-                    "Referência",
-                    options=get_filter_options('Referência', df),
-                    index=0
-                )
-                
-                temp_df = df[df['Referência'] == selections['Referência']] if selections['Referência'] != "Todos" else df
-                selections['Setor'] = st.selectbox(
-                    "Setor",
-                    options=get_filter_options('Setor', temp_df),
-                    index=0
-                )
-
-            with col2:
-                if selections['Setor'] != "Todos":
-                    temp_df = temp_df[temp_df['Setor'] == selections['Setor']]
-                
-                selections['Responsável'] = st.selectbox(
-                    "Responsável",
-                    options=get_filter_options('Responsável', temp_df),
-                    index=0
-                )
-                
-                if selections['Responsável'] != "Todos":
-                    temp_df = temp_df[temp_df['Responsável'] == selections['Responsável']]
-                
-                selections['Descrição Meta'] = st.selectbox(
-                    "Descrição Meta",
-                    options=get_filter_options('Descrição Meta', temp_df),
-                    index=0
-                )
-
-            with col3:
-                if selections['Descrição Meta'] != "Todos":
-                    temp_df = temp_df[temp_df['Descrição Meta'] == selections['Descrição Meta']]
-                
-                selections['Responsável Área'] = st.selectbox(
-                    "Responsável Área",
-                    options=get_filter_options('Responsável Área', temp_df),
-                    index=0
-                )
-                
-                if selections['Responsável Área'] != "Todos":
-                    temp_df = temp_df[temp_df['Responsável Área'] == selections['Responsável Área']]
-                
-                selections['E-mail'] = st.selectbox(
-                    "E-mail",
-                    options=get_filter_options('E-mail', temp_df),
-                    index=0
-                )
-            
+            layout = [(col1, 'Referência'), (col1, 'Setor'),
+                      (col2, 'Responsável'), (col2, 'Descrição Meta'),
+                      (col3, 'Responsável Área'), (col3, 'E-mail')]
+
+            # Cada filtro oferece só os valores compatíveis com as seleções anteriores
+            searched = set(selections)
+            for column, name in layout:
+                with column:
+                    if name in searched:
+                        st.selectbox(name, options=[selections[name]], disabled=True, help="Definido pela busca")
+                        continue
+                    selections[name] = st.selectbox(
+                        name,
+                        options=filters.options(name, user_key, selections),
+                        index=0
+                    )
+
             st.markdown("</div>", unsafe_allow_html=True)
 
-    # --- APLICA FILTROS ---
-    filtered_df = df.copy()
-    for col, val in selections.items():
-        if val != "Todos":
-            filtered_df = filtered_df[filtered_df[col] == val]
-    
+    # --- ORDENAÇÃO E PAGINAÇÃO (mantidas entre execuções e páginas) ---
+    sort_options = [SORT_NONE] + [c for c in SORT_COLUMNS if c in df.columns]
+    if restore("results_sort", SORT_NONE) not in sort_options:
+        st.session_state.results_sort = SORT_NONE
+    restore("results_order", "Crescente")
+    restore("results_page_size", RESULTS_PAGE_SIZE)
+    col_sort, col_order, col_size, col_page = st.columns([3, 2, 2, 2])
+    with col_sort:
+        st.selectbox("Ordenar por", sort_options, key="results_sort")
+    with col_order:
+        st.radio("Ordem", ["Crescente", "Decrescente"], key="results_order", horizontal=True)
+    with col_size:
+        st.selectbox("Por página", page_sizes(RESULTS_PAGE_SIZE), key="results_page_size")
+
+    sort_by = remember("results_sort")
+    descending = remember("results_order") == "Decrescente"
+    page_size = remember("results_page_size")
+    positions = filters.sorted_positions(user_key, selections, None if sort_by == SORT_NONE else sort_by, descending)
+
+    # Volta à primeira página quando o conjunto ou a ordem dos resultados muda
+    signature = (user_key, tuple(selections.items()), sort_by, descending, page_size)
+    if st.session_state.get("_results_signature") != signature:
+        st.session_state["_results_signature"] = signature
+        st.session_state.pop("results_page", None)
+        st.session_state.pop("_results_page", None)
+    page, pages, start, stop = page_bounds(len(positions), restore("results_page", 1), page_size)
+    st.session_state.results_page = page
+    with col_page:
+        st.number_input(f"Página (de {pages})", min_value=1, max_value=pages, step=1, key="results_page")
+    remember("results_page")
+
+    # Só as linhas da página atual viram DataFrame e cards
+    filtered_df = df.take(positions[start:stop])
+
     # --- EXIBIÇÃO DOS RESULTADOS ---
     st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
-    st.markdown(f"<div class='header-style'>📊 Resultados: {len(filtered_df)} registros encontrados</div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='header-style'>📊 Resultados: {len(positions)} registros encontrados</div>", unsafe_allow_html=True)
+    if len(positions):
+        st.caption(f"Mostrando {start + 1}–{stop} de {len(positions)}")
 
     if not filtered_df.empty:
-        for index, row in filtered_df.iterrows():
-            with st.container():
-                st.markdown("<div class='card'>", unsafe_allow_html=True)
-                
-                # Cabeçalho do card
-                cols_header = st.columns([4, 1, 1, 1, 1, 1, 1])
-                with cols_header[0]:
-                    st.markdown(f"<div class='subheader-style'>📑 {row['Descrição Meta']}</div>", unsafe_allow_html=True)
-                
-                # Conteúdo principal
-                cols_content = st.columns([4, 1, 1, 1, 1, 1, 1])
-                
-                with cols_content[0]:
-                    st.markdown(f"""
-                        <div class='status-box'>
-                            <p><strong>Referência:</strong> {row['Referência']}</p>
-                            <p><strong>Setor:</strong> {row['Setor']}</p>
-                            <p><strong>Responsável:</strong> {row['Responsável']}</p>
-                            <p><strong>Responsável Área:</strong> {row['Responsável Área']}</p>
-                            <p><strong>E-mail:</strong> {row['E-mail']}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                # Colunas de entregas
-                entregas = [
-                    ('1º Entrega', '1º Avaliação', 'Validação 1º Entrega', "pages/Entrega1.py"),
-                    ('2º Entrega', '2º Avaliação', 'Validação 2º Entrega', "pages/Entrega2.py"),
-                    ('3º Entrega', '3º Avaliação', 'Validação 3º Entrega', "pages/Entrega3.py"),
-                    ('4º Entrega', '4º Avaliação', 'Validação 4º Entrega', "pages/Entrega4.py"),
-                    ('5º Entrega', '5º Avaliação', 'Validação 5º Entrega', "pages/Entrega5.py"),
-                    ('6º Entrega', '6º Avaliação', 'Validação 6º Entrega', "pages/Entrega6.py")
-                ]
-                
-                for i, (entrega, avaliacao, validacao, page) in enumerate(entregas, start=1):
-                    with cols_content[i]:
-                        st.markdown(f"""
-                                        <div style="
-                                            border: 1px solid #ccc;
-                                            border-radius: 10px;
-                                            padding: 16px;
-                                            margin-bottom: 10px;
-                                            box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
-                                            height: 180px;
-                                            display: flex;
-                                            flex-direction: column;
-                                            justify-content: space-between;
-                                            overflow: auto;  /* Adiciona scroll se necessário */
-                                        ">
-                                            <p style="margin: 0;"><strong>{entrega.split('º')[0]}º Entrega:</strong> {row[entrega]}</p>
-                                            <p style="margin: 0;"><strong>→ </strong> {row[avaliacao]}</p>
-                                            <p style="margin: 0;"><strong>Status: </strong> {row[validacao]}</p>
-                                        </div>
-                                    """, unsafe_allow_html=True)
-                        
-                        if st.button(f"✏️ {entrega.split('º')[0]}º", key=f"editar_{i}_entrega_{index} Entrega"):
-                            st.session_state.selected_row_index = index
-                            st.switch_page(page)
-                
-                st.markdown("</div>", unsafe_allow_html=True)
-                st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
+        # HTML de todos os cards da página gerado de uma vez; só os botões são widgets
+        render_cards(filtered_df)
     else:
         st.warning("Nenhum registro encontrado com os filtros selecionados!")
 
@@ -322,3 +300,5 @@ else:
     - Nome correto da aba ('Cronograma')
     - Configuração do service account
     """)
+
+render_debug_panel(run_started, debug_info)
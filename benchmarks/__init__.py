@@ -0,0 +1 @@
+"""Benchmarks do PPR executados contra planilhas simuladas (sem rede)."""
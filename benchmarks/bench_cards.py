@@ -0,0 +1,134 @@
+"""
+Cards de resultado: laço original (um st.markdown por quadro, colunas e
+botões por linha) contra o HTML vetorizado de `utils.cards.render_cards`.
+
+Mede, para uma página com N linhas do Cronograma sintético, o tempo de
+execução da página no `AppTest`, as mensagens enviadas ao navegador (deltas
+do websocket) e os bytes dessas mensagens.
+
+Uso:
+    python -m benchmarks.bench_cards --rows 20 100 500 --repeat 3
+"""
+import argparse
+import statistics
+import time
+
+import streamlit as st
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import make_cronograma
+from utils.cards import render_cards
+from utils.schema import compact_cronograma, display_value
+
+# Página usada pelo AppTest: desenha as linhas com o renderizador escolhido
+SCRIPT = """
+import streamlit as st
+from benchmarks.bench_cards import RENDERERS
+RENDERERS[st.session_state["renderer"]](st.session_state["frame"])
+"""
+
+
+def render_loop(filtered_df):
+    """Renderização anterior dos cards (uma chamada por quadro e por botão)"""
+    for index, row in filtered_df.iterrows():
+        with st.container():
+            st.markdown("<div class='card'>", unsafe_allow_html=True)
+            cols_header = st.columns([4, 1, 1, 1, 1, 1, 1])
+            with cols_header[0]:
+                st.markdown(f"<div class='subheader-style'>📑 {row['Descrição Meta']}</div>", unsafe_allow_html=True)
+            cols_content = st.columns([4, 1, 1, 1, 1, 1, 1])
+            with cols_content[0]:
+                st.markdown(f"""
+                    <div class='status-box'>
+                        <p><strong>Referência:</strong> {row['Referência']}</p>
+                        <p><strong>Setor:</strong> {row['Setor']}</p>
+                        <p><strong>Responsável:</strong> {row['Responsável']}</p>
+                        <p><strong>Responsável Área:</strong> {row['Responsável Área']}</p>
+                        <p><strong>E-mail:</strong> {row['E-mail']}</p>
+                    </div>
+                """, unsafe_allow_html=True)
+            for i in range(1, 7):
+                with cols_content[i]:
+                    st.markdown(f"""
+                                    <div style="
+                                        border: 1px solid #ccc;
+                                        border-radius: 10px;
+                                        padding: 16px;
+                                        margin-bottom: 10px;
+                                        box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
+                                        height: 180px;
+                                        display: flex;
+                                        flex-direction: column;
+                                        justify-content: space-between;
+                                        overflow: auto;  /* Adiciona scroll se necessário */
+                                    ">
+                                        <p style="margin: 0;"><strong>{i}º Entrega:</strong> {display_value(row[f'{i}º Entrega'])}</p>
+                                        <p style="margin: 0;"><strong>→ </strong> {row[f'{i}º Avaliação']}</p>
+                                        <p style="margin: 0;"><strong>Status: </strong> {row[f'Validação {i}º Entrega']}</p>
+                                    </div>
+                                """, unsafe_allow_html=True)
+                    if st.button(f"✏️ {i}º", key=f"editar_{i}_entrega_{index} Entrega"):
+                        st.session_state.selected_row_index = index
+            st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
+
+
+RENDERERS = {"laço": render_loop, "vetorizado": render_cards}
+
+
+class MessageCounter:
+    """Conta as mensagens com delta (e os seus bytes) enfileiradas para o navegador"""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self._enqueue = ForwardMsgQueue.enqueue
+
+    def __enter__(self):
+        counter = self
+
+        def enqueue(queue, msg):
+            if msg.HasField("delta"):
+                counter.messages += 1
+                counter.bytes += msg.ByteSize()
+            return counter._enqueue(queue, msg)
+        ForwardMsgQueue.enqueue = enqueue
+        return self
+
+    def __exit__(self, *exc):
+        ForwardMsgQueue.enqueue = self._enqueue
+
+
+def run(frame, renderer, repeat):
+    """(mediana do tempo em ms, mensagens, bytes) de uma execução da página"""
+    times = []
+    for _ in range(repeat):
+        at = AppTest.from_string(SCRIPT, default_timeout=600)
+        at.session_state["renderer"] = renderer
+        at.session_state["frame"] = frame
+        with MessageCounter() as counter:
+            started = time.perf_counter()
+            at.run()
+            times.append((time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    return statistics.median(times), counter.messages, counter.bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cronograma = compact_cronograma(make_cronograma(max(args.rows)))
+    print(f"{'linhas':>7} {'renderizador':>12} {'tempo (ms)':>11} {'mensagens':>10} {'KB':>9}")
+    for n_rows in args.rows:
+        for renderer in RENDERERS:
+            elapsed, messages, size = run(cronograma.head(n_rows), renderer, args.repeat)
+            print(f"{n_rows:>7} {renderer:>12} {elapsed:>11.1f} {messages:>10} {size / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Custo da consulta de versão (VersionGate) contra o download completo do
+Cronograma, usando o backend SQLite em memória.
+
+Uso:
+    python -m benchmarks.bench_freshness --rows 1000 10000 50000 --repeat 20
+"""
+import argparse
+
+from benchmarks.synthetic import make_cronograma
+from utils.config import WORKSHEET_NAME
+from utils.freshness import VersionGate
+from utils.storage import SQLiteBackend
+
+
+def run(n_rows, repeat):
+    backend = SQLiteBackend(":memory:")
+    backend.load_dataframe(WORKSHEET_NAME, make_cronograma(n_rows))
+    gate = VersionGate(WORKSHEET_NAME, interval=0, backend=backend)
+    for _ in range(repeat):
+        gate.version()
+        gate.fetch(lambda: backend.read_tab(WORKSHEET_NAME))
+    return gate.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'consulta (ms)':>14} {'download (ms)':>14} {'razão':>8}")
+    for n_rows in args.rows:
+        report = run(n_rows, args.repeat)
+        print(f"{n_rows:>8} {report['probe_avg_ms']:>14.3f} {report['fetch_avg_ms']:>14.3f} "
+              f"{report['fetch_to_probe_ratio']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Memória do Cronograma em cache antes e depois do esquema compacto
+(`utils.schema.compact_cronograma`), sobre uma planilha sintética grande.
+
+Os valores passam por JSON para reproduzir a resposta da API (cada célula é
+um objeto de texto distinto, como no `get_all_records`).
+
+Uso:
+    python -m benchmarks.bench_memory --rows 10000 100000 500000
+"""
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_cronograma
+from utils.google_sheets import dataframe_to_values
+from utils.schema import compact_cronograma, frame_footprint
+
+
+def as_api_frame(n_rows):
+    df = make_cronograma(n_rows)
+    records = json.loads(json.dumps(dataframe_to_values(df)))
+    return pd.DataFrame(records, columns=list(df.columns))
+
+
+def run(n_rows):
+    raw = as_api_frame(n_rows)
+    started = time.perf_counter()
+    compact = compact_cronograma(raw)
+    elapsed = time.perf_counter() - started
+    return frame_footprint(raw)["total"], frame_footprint(compact)["total"], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 500000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'antes (MB)':>11} {'depois (MB)':>12} {'redução':>8} {'conversão (s)':>14}")
+    for n_rows in args.rows:
+        before, after, elapsed = run(n_rows)
+        print(f"{n_rows:>8} {before / 1024 ** 2:>11.1f} {after / 1024 ** 2:>12.1f} "
+              f"{before / after:>7.1f}x {elapsed:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
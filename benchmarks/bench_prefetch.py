@@ -0,0 +1,66 @@
+"""
+Tempo até ter Usuários e Cronograma em mãos: leituras em sequência contra
+leituras antecipadas em paralelo (`utils.prefetch`), com latência de rede
+simulada sobre o backend SQLite em memória.
+
+Uso:
+    python -m benchmarks.bench_prefetch --rows 5000 --latency 0.4 0.8
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import make_cronograma
+from utils.config import USERS_LOGIN_COLUMNS, USERS_SHEET, WORKSHEET_NAME
+from utils.prefetch import prefetch
+from utils.storage import SQLiteBackend
+
+
+class SlowBackend:
+    """Acrescenta uma latência fixa por aba a cada leitura"""
+
+    def __init__(self, backend, latency):
+        self.backend = backend
+        self.latency = latency
+
+    def read_tab(self, tab, columns=None, dtypes=None):
+        time.sleep(self.latency[tab])
+        return self.backend.read_tab(tab, columns=columns, dtypes=dtypes)
+
+
+def run(n_rows, users_latency, cronograma_latency):
+    backend = SQLiteBackend(":memory:")
+    backend.load_dataframe(WORKSHEET_NAME, make_cronograma(n_rows))
+    backend.append_rows(USERS_SHEET, [[f"user{i}", f"user{i}@example.com", "x", "Avaliador", ""]
+                                      for i in range(200)])
+    slow = SlowBackend(backend, {USERS_SHEET: users_latency, WORKSHEET_NAME: cronograma_latency})
+
+    started = time.perf_counter()
+    slow.read_tab(USERS_SHEET, columns=USERS_LOGIN_COLUMNS)
+    slow.read_tab(WORKSHEET_NAME)
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cronograma = prefetch(("bench", n_rows, "cronograma"), lambda: slow.read_tab(WORKSHEET_NAME))
+    users = prefetch(("bench", n_rows, "usuarios"),
+                     lambda: slow.read_tab(USERS_SHEET, columns=USERS_LOGIN_COLUMNS))
+    users.result()
+    cronograma.result()
+    parallel = time.perf_counter() - started
+    return sequential, parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--latency", type=float, nargs=2, default=[0.4, 0.8],
+                        metavar=("USUARIOS", "CRONOGRAMA"), help="latência simulada de cada aba (s)")
+    args = parser.parse_args()
+
+    sequential, parallel = run(args.rows, *args.latency)
+    print(f"latências: Usuários {args.latency[0]:.2f}s, Cronograma {args.latency[1]:.2f}s")
+    print(f"em sequência: {sequential:.3f}s")
+    print(f"em paralelo:  {parallel:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
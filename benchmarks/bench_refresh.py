@@ -0,0 +1,91 @@
+"""
+Botão Atualizar com várias sessões abertas: limpar todo o cache (todas as
+sessões esperam o novo download) contra invalidar só a região do Cronograma
+(`utils.cache_regions`), em que uma sessão carrega a nova versão e as demais
+seguem com a anterior até ela ficar pronta.
+
+Mede a latência de `load_cronograma` em N sessões simultâneas logo após a
+invalidação, com latência de rede simulada, e o número de downloads,
+inclusive com cliques repetidos do mesmo usuário (limitados por
+`REFRESH_INTERVAL`).
+
+Uso:
+    python -m benchmarks.bench_refresh --rows 20000 --sessions 20 --latency 0.8
+"""
+import os
+import tempfile
+
+# O app lê a configuração ao ser importado: backend em memória e cache descartável
+os.environ["PPR_STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("PPR_CACHE_DIR", tempfile.mkdtemp(prefix="ppr-bench-"))
+
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks.bench_sessions import SlowBackend
+from benchmarks.synthetic import make_cronograma
+from utils.config import WORKSHEET_NAME
+from utils.cronograma import CRONOGRAMA_REGION, load_cronograma, refresh_cronograma
+from utils.freshness import get_version_gate
+from utils.storage import get_backend, set_backend
+
+
+def concurrent_loads(n_sessions):
+    """Latência (ms) de `load_cronograma` em N sessões que chegam ao mesmo tempo"""
+    times = [None] * n_sessions
+    start = threading.Barrier(n_sessions)
+
+    def session(i):
+        start.wait()
+        started = time.perf_counter()
+        load_cronograma()
+        times[i] = (time.perf_counter() - started) * 1000
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(n_sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return times
+
+
+def run(strategy, n_sessions, clicks):
+    gate = get_version_gate(WORKSHEET_NAME)
+    CRONOGRAMA_REGION.reset()
+    load_cronograma()
+    fetches = gate.fetches
+    if strategy == "limpar tudo":
+        for _ in range(clicks):
+            CRONOGRAMA_REGION.reset()
+            gate.expire()
+    else:
+        for _ in range(clicks):
+            refresh_cronograma("usuario.bench")
+    times = concurrent_loads(n_sessions)
+    return times, gate.fetches - fetches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.8, help="latência simulada do download (s)")
+    parser.add_argument("--clicks", type=int, default=3, help="cliques seguidos do mesmo usuário")
+    args = parser.parse_args()
+
+    backend = get_backend()
+    backend.load_dataframe(WORKSHEET_NAME, make_cronograma(args.rows))
+    set_backend(SlowBackend(backend.inner, args.latency))
+
+    print(f"linhas: {args.rows}, sessões: {args.sessions}, latência: {args.latency:.2f}s, cliques: {args.clicks}")
+    print(f"{'estratégia':<16} {'mediana (ms)':>13} {'máx (ms)':>10} {'esperaram':>10} {'downloads':>10}")
+    for strategy in ["limpar tudo", "região"]:
+        times, fetches = run(strategy, args.sessions, args.clicks)
+        waited = sum(1 for t in times if t >= args.latency * 1000)
+        print(f"{strategy:<16} {statistics.median(times):>13.1f} {max(times):>10.1f} {waited:>10} {fetches:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Vazão do agendador de cota contra o simulador de cota do Sheets, com e sem
+os baldes de tokens (relógio simulado, sem rede e sem esperar o tempo real).
+
+Uso:
+    python -m benchmarks.bench_scheduler --calls 300 1200 3000 --quota 60 300
+"""
+import argparse
+import random
+
+from utils.scheduler import FakeClock, QuotaExceeded, QuotaSimulator, RequestScheduler, simulate_throughput
+
+
+def without_buckets(n_calls, per_minute, latency):
+    """Só retentativas com backoff: a cota é descoberta pelos 429"""
+    clock = FakeClock()
+    scheduler = RequestScheduler(quotas={"read": float("inf")}, per_user_quota=float("inf"), clock=clock,
+                                 rng=random.Random(0))
+    api = QuotaSimulator(clock, per_minute, latency)
+    failed = 0
+    for _ in range(n_calls):
+        try:
+            scheduler.call(api.request)
+        except QuotaExceeded:
+            failed += 1
+    elapsed = clock.now()
+    return (n_calls - failed) / elapsed * 60 if elapsed else float("inf"), api.rejected, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, nargs="+", default=[300, 1200, 3000])
+    parser.add_argument("--quota", type=int, nargs="+", default=[60, 300])
+    parser.add_argument("--latency", type=float, default=0.05, help="latência simulada por chamada (s)")
+    args = parser.parse_args()
+
+    print(f"{'cota/min':>8} {'chamadas':>9} | {'com baldes: /min':>16} {'429':>5} | "
+          f"{'sem baldes: /min':>16} {'429':>5} {'falhas':>7}")
+    for quota in args.quota:
+        for n_calls in args.calls:
+            rate, rejected, _ = simulate_throughput(n_calls, quota, latency=args.latency)
+            raw_rate, raw_rejected, failed = without_buckets(n_calls, quota, args.latency)
+            print(f"{quota:>8} {n_calls:>9} | {rate:>16.1f} {rejected:>5} | "
+                  f"{raw_rate:>16.1f} {raw_rejected:>5} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
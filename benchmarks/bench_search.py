@@ -0,0 +1,51 @@
+"""
+Busca do painel: tempo de construção do índice (uma vez por versão) e
+latência por consulta, simulando a digitação letra a letra.
+
+Uso:
+    python -m benchmarks.bench_search --rows 10000 100000 500000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.synthetic import make_cronograma
+from utils.filters import FilterEngine
+from utils.schema import compact_cronograma
+
+QUERIES = ["reduzir custo", "meta 12", "sergio", "ana.silva", "gabriela sou"]
+
+
+def typed(query):
+    """Prefixos de `query`, como chegam enquanto o usuário digita"""
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def run(n_rows):
+    engine = FilterEngine(compact_cronograma(make_cronograma(n_rows)))
+    started = time.perf_counter()
+    engine.search_index()
+    build = time.perf_counter() - started
+
+    times = []
+    for query in QUERIES:
+        for prefix in typed(query):
+            started = time.perf_counter()
+            engine.search(prefix)
+            times.append((time.perf_counter() - started) * 1000)
+    return build, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 500000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'índice (s)':>11} {'consultas':>10} {'mediana (ms)':>13} {'máx (ms)':>10}")
+    for n_rows in args.rows:
+        build, times = run(n_rows)
+        print(f"{n_rows:>8} {build:>11.2f} {len(times):>10} {statistics.median(times):>13.2f} {max(times):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
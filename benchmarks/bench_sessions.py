@@ -0,0 +1,143 @@
+"""
+Latência do login até o painel ao recarregar a página: novo login (tela de
+login, leitura de Usuários, autenticação e painel) contra a sessão restaurada
+pelo cookie (`utils.sessions`), com latência de rede simulada sobre o
+backend SQLite em memória.
+
+Cada repetição começa com os caches frios, como numa recarga depois de a
+versão da planilha mudar.
+
+Uso:
+    python -m benchmarks.bench_sessions --rows 5000 --latency 0.4 --repeat 5
+"""
+import os
+import tempfile
+
+# O app lê a configuração ao ser importado: backend em memória e cache descartável
+os.environ["PPR_STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("PPR_CACHE_DIR", tempfile.mkdtemp(prefix="ppr-bench-"))
+
+import argparse
+import statistics
+import time
+from unittest import mock
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import make_cronograma, make_usuarios
+from utils.cache_regions import reset_cache_regions
+from utils.config import USERS_SHEET, WORKSHEET_NAME
+from utils.freshness import get_version_gate
+from utils.metrics import get_metrics
+import utils.sessions as sessions
+from utils.storage import get_backend, set_backend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+APP_TIMEOUT = 600
+
+
+class SlowBackend:
+    """Acrescenta uma latência fixa a cada leitura do backend"""
+
+    def __init__(self, backend, latency):
+        self.backend = backend
+        self.name = backend.name
+        self.latency = latency
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def read_tab(self, tab, columns=None, dtypes=None):
+        time.sleep(self.latency)
+        return self.backend.read_tab(tab, columns=columns, dtypes=dtypes)
+
+    def read_rows(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return self.backend.read_rows(*args, **kwargs)
+
+
+def reset_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    reset_cache_regions()
+    get_version_gate(WORKSHEET_NAME).expire()
+    get_version_gate(USERS_SHEET).expire()
+
+
+def run_page(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Erro ao executar a página: {at.exception[0].message}")
+    return at
+
+
+def reads(tab):
+    return sum(1 for call in get_metrics().recent() if call.op == "read_tab" and call.tab == tab)
+
+
+def fresh_login(login):
+    """Tela de login + Entrar até o painel; retorna (segundos, token criado)"""
+    started = time.perf_counter()
+    at = run_page(AppTest.from_file(APP, default_timeout=APP_TIMEOUT))
+    at.text_input[0].input(login)
+    at.text_input[1].input(login)
+    at.button[0].click()
+    run_page(at)
+    elapsed = time.perf_counter() - started
+    if not at.session_state["logged_in"]:
+        raise RuntimeError("Login falhou")
+    return elapsed, at.session_state["session_token"]
+
+
+def restored(token):
+    """Recarga com o cookie da sessão até o painel; retorna segundos"""
+    started = time.perf_counter()
+    at = AppTest.from_file(APP, default_timeout=APP_TIMEOUT)
+    # O AppTest não envia cookies: entrega o token como se viesse do navegador
+    with mock.patch.object(sessions, "_cookie_token", return_value=token):
+        run_page(at)
+    elapsed = time.perf_counter() - started
+    if not at.session_state["logged_in"]:
+        raise RuntimeError("Sessão não restaurada")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.4, help="latência simulada por leitura (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cronograma = make_cronograma(args.rows)
+    usuarios = make_usuarios(cronograma)
+    backend = get_backend()
+    backend.load_dataframe(WORKSHEET_NAME, cronograma)
+    backend.load_dataframe(USERS_SHEET, usuarios)
+    set_backend(SlowBackend(backend.inner, args.latency))
+    login = str(usuarios.loc[0, "Login"])
+
+    times = {"novo login": [], "sessão restaurada": []}
+    users_reads = {"novo login": 0, "sessão restaurada": 0}
+    for _ in range(args.repeat):
+        reset_caches()
+        before = reads(USERS_SHEET)
+        elapsed, token = fresh_login(login)
+        times["novo login"].append(elapsed)
+        users_reads["novo login"] += reads(USERS_SHEET) - before
+
+        reset_caches()
+        before = reads(USERS_SHEET)
+        times["sessão restaurada"].append(restored(token))
+        users_reads["sessão restaurada"] += reads(USERS_SHEET) - before
+
+    print(f"linhas: {args.rows}, latência por leitura: {args.latency:.2f}s, repetições: {args.repeat}")
+    print(f"{'caminho':<18} {'mediana (s)':>12} {'mín (s)':>9} {'leituras de Usuários':>21}")
+    for name, values in times.items():
+        print(f"{name:<18} {statistics.median(values):>12.3f} {min(values):>9.3f} {users_reads[name]:>21}")
+
+
+if __name__ == "__main__":
+    main()
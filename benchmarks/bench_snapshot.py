@@ -0,0 +1,64 @@
+"""
+Formato e tempo de carga dos snapshots locais do Cronograma.
+
+Compara o snapshot Arrow IPC (com e sem mapeamento em memória) com Parquet e
+CSV, medindo tamanho em disco, tempo de gravação e tempo de carga.
+
+Uso:
+    python -m benchmarks.bench_snapshot --rows 1000 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_cronograma
+from utils.snapshot import load_snapshot, save_snapshot, snapshot_path
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(n_rows, directory):
+    df = make_cronograma(n_rows)
+    parquet = os.path.join(directory, "cronograma.parquet")
+    csv = os.path.join(directory, "cronograma.csv")
+
+    results = []
+    save = timed(lambda: save_snapshot("cronograma", df, version="1", directory=directory))
+    path = snapshot_path("cronograma", directory)
+    results.append(("arrow (mmap)", os.path.getsize(path), save,
+                    timed(lambda: load_snapshot("cronograma", directory))))
+    results.append(("arrow", os.path.getsize(path), save,
+                    timed(lambda: load_snapshot("cronograma", directory, memory_map=False))))
+
+    save = timed(lambda: df.to_parquet(parquet, index=False))
+    results.append(("parquet", os.path.getsize(parquet), save, timed(lambda: pd.read_parquet(parquet))))
+
+    save = timed(lambda: df.to_csv(csv, index=False))
+    results.append(("csv", os.path.getsize(csv), save, timed(lambda: pd.read_csv(csv, keep_default_na=False))))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'formato':>13} {'tamanho (KB)':>13} {'gravação (ms)':>14} {'carga (ms)':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n_rows in args.rows:
+            for fmt, size, save, load in run(n_rows, directory):
+                print(f"{n_rows:>8} {fmt:>13} {size / 1024:>13.0f} {save * 1000:>14.1f} {load * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Pico de memória (RSS) da leitura completa (`read_sheet_to_dataframe`) contra
+a leitura em blocos (`iter_sheet_chunks`) do Cronograma, ambas calculando a
+mesma agregação (linhas por Setor) sobre uma planilha simulada.
+
+Cada medição roda em um processo separado; o pico é medido só durante a
+leitura (VmHWM zerado via /proc/self/clear_refs, portanto apenas Linux).
+
+Uso:
+    python -m benchmarks.bench_streaming --rows 10000 50000 200000 --chunk 5000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+URL = "https://docs.google.com/spreadsheets/d/benchmark/edit"
+WORKSHEET_NAME = "Cronograma"
+
+
+def _status_kb(field):
+    with open("/proc/self/status") as f:
+        return int(re.search(rf"{field}:\s+(\d+)", f.read()).group(1))
+
+
+def child(mode, n_rows, chunk_rows):
+    """Executa uma leitura e imprime 'pico_kb segundos setores'"""
+    import gc
+
+    from benchmarks.fake_sheets import FakeWorksheet, install_fake_connection
+    from benchmarks.synthetic import make_cronograma
+    from utils.google_sheets import dataframe_to_values, iter_sheet_chunks, read_sheet_to_dataframe
+
+    df = make_cronograma(n_rows)
+    values = [list(df.columns)] + dataframe_to_values(df)
+    worksheet = FakeWorksheet(WORKSHEET_NAME, values)
+    del df, values
+    gc.collect()
+
+    with install_fake_connection(worksheet):
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        baseline = _status_kb("VmRSS")
+        started = time.perf_counter()
+        if mode == "full":
+            counts = read_sheet_to_dataframe(URL, WORKSHEET_NAME)["Setor"].value_counts()
+        else:
+            counts = None
+            for chunk in iter_sheet_chunks(URL, WORKSHEET_NAME, chunk_rows):
+                part = chunk["Setor"].value_counts()
+                counts = part if counts is None else counts.add(part, fill_value=0)
+        elapsed = time.perf_counter() - started
+        peak = _status_kb("VmHWM") - baseline
+    print(peak, elapsed, len(counts))
+
+
+def measure(mode, n_rows, chunk_rows, cache_dir):
+    env = dict(os.environ, PPR_CACHE_DIR=cache_dir)
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_streaming", "--child", mode,
+                          "--rows", str(n_rows), "--chunk", str(chunk_rows)],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    peak, elapsed, _ = out.split()[-3:]
+    return int(peak), float(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--chunk", type=int, default=5000, help="linhas por bloco")
+    parser.add_argument("--child", choices=["full", "chunks"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.rows[0], args.chunk)
+        return
+
+    print(f"{'linhas':>8} {'modo':>7} {'pico RSS (MB)':>14} {'tempo (s)':>10}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for n_rows in args.rows:
+            for mode in ("full", "chunks"):
+                peak, elapsed = measure(mode, n_rows, args.chunk, cache_dir)
+                print(f"{n_rows:>8} {mode:>7} {peak / 1024:>14.1f} {elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark de `write_dataframe_to_sheet`: modo 'rows' (um append por linha)
+contra o modo 'batch' (atualização por intervalo).
+
+Uso:
+    python -m benchmarks.bench_write_dataframe --rows 100 1000 5000 --latency 0.005
+"""
+import argparse
+import time
+
+from benchmarks.fake_sheets import FakeWorksheet, install_fake_connection
+from benchmarks.synthetic import make_cronograma
+from utils.google_sheets import write_dataframe_to_sheet
+
+URL = "https://docs.google.com/spreadsheets/d/benchmark/edit"
+WORKSHEET_NAME = "Cronograma"
+
+
+def run(n_rows, mode, latency):
+    df = make_cronograma(n_rows)
+    worksheet = FakeWorksheet(WORKSHEET_NAME, latency=latency)
+    with install_fake_connection(worksheet):
+        start = time.perf_counter()
+        write_dataframe_to_sheet(URL, WORKSHEET_NAME, df, mode=mode)
+        elapsed = time.perf_counter() - start
+    return worksheet.calls, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="latência simulada por chamada à API (segundos)")
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'modo':>6} {'chamadas':>9} {'tempo (s)':>10}")
+    for n_rows in args.rows:
+        for mode in ("rows", "batch"):
+            calls, elapsed = run(n_rows, mode, args.latency)
+            print(f"{n_rows:>8} {mode:>6} {calls:>9} {elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
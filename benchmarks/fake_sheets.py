@@ -0,0 +1,212 @@
+"""
+Planilha simulada para benchmarks.
+
+Imita o subconjunto da API do gspread usado pelo app, guardando os valores
+em memória, contando as chamadas à API e simulando uma latência fixa por
+requisição. `install_fake_connection` troca a conexão compartilhada de
+`utils.connection` por uma conexão falsa com essas planilhas.
+"""
+import time
+from contextlib import contextmanager
+
+import gspread
+
+import utils.connection as connection
+
+
+class FakeWorksheet:
+    """Aba em memória com contagem de chamadas e latência simulada"""
+
+    def __init__(self, title, values=None, latency=0.0, rows=1000, cols=26):
+        self.title = title
+        self.id = 0
+        self.spreadsheet = None
+        self.latency = latency
+        self.calls = 0
+        self.cells_written = 0
+        self._values = [list(r) for r in (values or [])]
+        self.row_count = max(rows, len(self._values))
+        self.col_count = max(cols, max((len(r) for r in self._values), default=0))
+
+    # --- Infraestrutura ---
+    def _call(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _set(self, row, col, value):
+        while len(self._values) < row:
+            self._values.append([])
+        line = self._values[row - 1]
+        while len(line) < col:
+            line.append("")
+        line[col - 1] = value
+        self.cells_written += 1
+
+    def _write_block(self, start, values):
+        row0, col0 = gspread.utils.a1_to_rowcol(start.split(":")[0])
+        for r, line in enumerate(values):
+            for c, value in enumerate(line):
+                self._set(row0 + r, col0 + c, value)
+        self.row_count = max(self.row_count, len(self._values))
+
+    def reset_counters(self):
+        self.calls = 0
+        self.cells_written = 0
+
+    # --- Leitura ---
+    def get_all_values(self):
+        self._call()
+        width = max((len(r) for r in self._values), default=0)
+        return [r + [""] * (width - len(r)) for r in self._values]
+
+    def get_all_records(self):
+        values = self.get_all_values()
+        if not values:
+            return []
+        header = values[0]
+        # Como o gspread: converte textos numéricos em números
+        return [dict(zip(header, gspread.utils.numericise_all(r))) for r in values[1:]]
+
+    def row_values(self, row):
+        self._call()
+        return list(self._values[row - 1]) if row <= len(self._values) else []
+
+    def col_values(self, col):
+        self._call()
+        return [r[col - 1] if len(r) >= col else "" for r in self._values]
+
+    def get(self, range_name):
+        return self.batch_get([range_name])[0]
+
+    def batch_get(self, ranges, **kwargs):
+        self._call()
+        results = []
+        for rng in ranges:
+            grid = gspread.utils.a1_range_to_grid_range(rng)
+            r0, r1 = grid.get("startRowIndex", 0), grid.get("endRowIndex", len(self._values))
+            c0, c1 = grid.get("startColumnIndex", 0), grid.get("endColumnIndex")
+            block = [[str(v) for v in line[c0:c1]] for line in self._values[r0:r1]]
+            # Como a API: remove células e linhas vazias do final
+            block = [line[:max((i + 1 for i, v in enumerate(line) if v != ""), default=0)] for line in block]
+            while block and not block[-1]:
+                block.pop()
+            results.append(block)
+        return results
+
+    # --- Escrita ---
+    def clear(self):
+        self._call()
+        self._values = []
+
+    def resize(self, rows=None, cols=None):
+        self._call()
+        if rows is not None:
+            self.row_count = rows
+            del self._values[rows:]
+        if cols is not None:
+            self.col_count = cols
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values])
+
+    def append_rows(self, values, **kwargs):
+        self._call()
+        start = len(self._values) + 1
+        self._write_block(gspread.utils.rowcol_to_a1(start, 1), values)
+        end = gspread.utils.rowcol_to_a1(start + len(values) - 1, max(len(r) for r in values))
+        return {"updates": {"updatedRange": f"'{self.title}'!{gspread.utils.rowcol_to_a1(start, 1)}:{end}"}}
+
+    def update(self, values, range_name=None, **kwargs):
+        self._call()
+        self._write_block(range_name or "A1", values)
+
+    def update_cell(self, row, col, value):
+        self._call()
+        self._set(row, col, value)
+
+    def batch_update(self, data, **kwargs):
+        self._call()
+        for item in data:
+            self._write_block(item["range"], item["values"])
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call()
+        end_index = end_index or start_index
+        del self._values[start_index - 1:end_index]
+        self.row_count -= end_index - start_index + 1
+
+
+class FakeSpreadsheet:
+    """Planilha em memória composta de FakeWorksheets"""
+
+    def __init__(self, worksheets):
+        self._worksheets = {ws.title: ws for ws in worksheets}
+        for sheet_id, ws in enumerate(worksheets):
+            ws.id = sheet_id
+            ws.spreadsheet = self
+
+    def batch_update(self, body):
+        """Aplica updateCells, appendCells e deleteDimension (subconjunto da API)"""
+        by_id = {ws.id: ws for ws in self._worksheets.values()}
+        touched = set()
+        for request in body["requests"]:
+            (kind, spec), = request.items()
+            if kind == "updateCells":
+                rng = spec["range"]
+                ws = by_id[rng["sheetId"]]
+                for r, row in enumerate(spec["rows"]):
+                    for c, cell in enumerate(row["values"]):
+                        value, = cell["userEnteredValue"].values()
+                        ws._set(rng["startRowIndex"] + r + 1, rng["startColumnIndex"] + c + 1, value)
+            elif kind == "appendCells":
+                ws = by_id[spec["sheetId"]]
+                values = [[next(iter(cell["userEnteredValue"].values())) for cell in row["values"]]
+                          for row in spec["rows"]]
+                ws._write_block(gspread.utils.rowcol_to_a1(len(ws._values) + 1, 1), values)
+            elif kind == "deleteDimension":
+                rng = spec["range"]
+                ws = by_id[rng["sheetId"]]
+                del ws._values[rng["startIndex"]:rng["endIndex"]]
+                ws.row_count -= rng["endIndex"] - rng["startIndex"]
+            else:
+                raise NotImplementedError(kind)
+            touched.add(ws)
+        # Uma única requisição HTTP, contabilizada na primeira aba afetada
+        for ws in list(touched)[:1]:
+            ws._call()
+        return {"replies": [{} for _ in body["requests"]]}
+
+    def worksheet(self, title):
+        try:
+            return self._worksheets[title]
+        except KeyError:
+            raise gspread.exceptions.WorksheetNotFound(title)
+
+
+class FakeConnection:
+    """Substituto de `SheetsConnection` que nunca acessa a rede"""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_spreadsheet(self, url):
+        return self.spreadsheet
+
+    def open_worksheet(self, url, worksheet_name):
+        return self.spreadsheet.worksheet(worksheet_name)
+
+    def invalidate(self, url=None, worksheet_name=None):
+        pass
+
+
+@contextmanager
+def install_fake_connection(*worksheets):
+    """Instala uma conexão falsa com as abas informadas durante o bloco"""
+    previous = connection._connection
+    fake = FakeConnection(FakeSpreadsheet(worksheets))
+    connection._connection = fake
+    try:
+        yield fake
+    finally:
+        connection._connection = previous
@@ -0,0 +1,245 @@
+"""
+Suíte de benchmarks ponta a ponta do app sobre o backend SQLite em memória.
+
+Para cada tamanho de Cronograma sintético (com Usuários correspondentes),
+mede os caminhos críticos:
+
+- users_read: leitura das colunas de login de Usuários
+- login: `authenticate_user` sobre o diretório de usuários (Login → registro)
+- login_screen: execução do app.py sem login (tela de acesso)
+- load_data: leitura completa do Cronograma, esquema compacto, índices (E-mail e filtros)
+  e visão do usuário
+- app_cold: execução do app.py logado com os caches vazios
+- app_warm: nova execução do app.py (dados em cache: filtros e cards)
+- filter_change: troca do filtro de Setor
+- entrega_open: abertura da página Entrega1
+- entrega_save: salvar a avaliação na Entrega1 e enviar a fila de escrita
+- upload: envio de documento e gravação do link
+
+As páginas rodam pelo `streamlit.testing.v1.AppTest`. O resultado (mediana,
+mínimo e máximo em ms por etapa) é gravado em JSON com o commit atual, para
+comparar execuções entre commits (`--compare`).
+
+Uso:
+    python -m benchmarks.suite --rows 1000 10000 100000 --repeat 3
+    python -m benchmarks.suite --rows 1000 --compare benchmarks/results/<commit anterior>.json
+"""
+import os
+import tempfile
+
+# O app lê a configuração ao ser importado: backend em memória e cache descartável
+os.environ["PPR_STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("PPR_CACHE_DIR", tempfile.mkdtemp(prefix="ppr-bench-"))
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import make_cronograma, make_usuarios
+from utils.cache_regions import reset_cache_regions
+from utils.config import USERS_LOGIN_COLUMNS, USERS_SHEET, WORKSHEET_NAME
+from utils.filters import FilterEngine
+from utils.freshness import get_version_gate
+from utils.partition import PartitionedFrame
+from utils.schema import compact_cronograma
+from utils.storage import get_backend
+from utils.users import UserDirectory
+from utils.write_queue import get_write_queue
+from auth2 import authenticate_user
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+APP_TIMEOUT = 600
+UPLOAD_BYTES = 200_000
+
+
+def timed(func, repeat):
+    """Executa `func` `repeat` vezes; retorna os tempos em ms"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def summary(times):
+    return {"median_ms": round(statistics.median(times), 3), "min_ms": round(min(times), 3),
+            "max_ms": round(max(times), 3), "runs": len(times)}
+
+
+def reset_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    reset_cache_regions()
+    get_version_gate(WORKSHEET_NAME).expire()
+    get_version_gate(USERS_SHEET).expire()
+
+
+def run_page(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Erro ao executar a página: {at.exception[0].message}")
+    return at
+
+
+def seed(n_rows):
+    """Carrega o Cronograma e os Usuários sintéticos; retorna (cronograma, usuário típico)"""
+    cronograma = make_cronograma(n_rows)
+    usuarios = make_usuarios(cronograma)
+    backend = get_backend()
+    backend.load_dataframe(WORKSHEET_NAME, cronograma)
+    backend.load_dataframe(USERS_SHEET, usuarios)
+    reset_caches()
+
+    # Usuário com a quantidade mediana de metas
+    counts = cronograma["E-mail"].value_counts()
+    email = counts.index[len(counts) // 2]
+    user = usuarios[usuarios["Email"] == email].iloc[0]
+    return cronograma, user
+
+
+def logged_in_page(path, user, **state):
+    at = AppTest.from_file(os.path.join(ROOT, path), default_timeout=APP_TIMEOUT)
+    at.session_state["logged_in"] = True
+    at.session_state["user_info"] = {c: user[c] for c in USERS_LOGIN_COLUMNS}
+    at.session_state["email"] = user["Email"]
+    at.session_state["tipo_usuario"] = user["Tipo de Usuário"]
+    for key, value in state.items():
+        at.session_state[key] = value
+    return at
+
+
+def run_size(n_rows, repeat):
+    cronograma, user = seed(n_rows)
+    results = {}
+
+    df_users = get_backend().read_tab(USERS_SHEET, columns=USERS_LOGIN_COLUMNS)
+    results["users_read"] = timed(lambda: get_backend().read_tab(USERS_SHEET, columns=USERS_LOGIN_COLUMNS),
+                                  repeat)
+    users = UserDirectory(df_users)
+    results["login"] = timed(lambda: authenticate_user(user["Login"], user["Senha"], users), repeat)
+    results["login_screen"] = timed(
+        lambda: run_page(AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=APP_TIMEOUT)), repeat)
+
+    def load_data():
+        filters = FilterEngine(PartitionedFrame(compact_cronograma(get_backend().read_tab(WORKSHEET_NAME))))
+        return filters.result(user["Email"])
+    results["load_data"] = timed(load_data, repeat)
+
+    def app_cold():
+        reset_caches()
+        run_page(logged_in_page("app.py", user))
+    results["app_cold"] = timed(app_cold, repeat)
+
+    at = run_page(logged_in_page("app.py", user))
+    results["app_warm"] = timed(lambda: run_page(at), repeat)
+
+    setor = next(s for s in at.selectbox if s.label == "Setor")
+    choices = [o for o in setor.options if o != "Todos"][:1] + ["Todos"]
+    changes = iter(choices * repeat)
+
+    def filter_change():
+        next(s for s in at.selectbox if s.label == "Setor").select(next(changes))
+        run_page(at)
+    results["filter_change"] = timed(filter_change, repeat)
+
+    row_index = int(cronograma.index[cronograma["E-mail"] == user["Email"]][0])
+    page = logged_in_page("pages/Entrega1.py", user, selected_row_index=row_index)
+    results["entrega_open"] = timed(lambda: run_page(page), repeat)
+
+    edits = iter(range(repeat))
+
+    def entrega_save():
+        page.text_input[0].input(f"Avaliação {next(edits)}")
+        next(b for b in page.button if "Salvar" in b.label).click()
+        page.run()
+        get_write_queue().flush()
+    results["entrega_save"] = timed(entrega_save, repeat)
+
+    content = b"%PDF-1.4\n" + b"0" * UPLOAD_BYTES
+
+    def upload():
+        link = get_backend().upload_document(io.BytesIO(content), "documento.pdf", "application/pdf")
+        get_backend().update_cells(WORKSHEET_NAME, [(cronograma.at[row_index, "key"], "Doc1", link)])
+    results["upload"] = timed(upload, repeat)
+
+    return {phase: summary(times) for phase, times in results.items()}
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(current, previous):
+    """Imprime a mediana anterior, a atual e a razão entre elas"""
+    print(f"\nComparação com {previous.get('commit')} ({previous.get('created')}):")
+    print(f"{'linhas':>8} {'etapa':>14} {'antes (ms)':>11} {'agora (ms)':>11} {'razão':>7}")
+    for size, phases in current["results"].items():
+        for phase, stats in phases.items():
+            before = previous.get("results", {}).get(size, {}).get(phase)
+            if not before:
+                continue
+            ratio = stats["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            flag = "  ⚠️" if ratio > 1.2 else ""
+            print(f"{size:>8} {phase:>14} {before['median_ms']:>11.1f} {stats['median_ms']:>11.1f} "
+                  f"{ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="arquivo JSON de saída (padrão: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "streamlit": st.__version__,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    print(f"{'linhas':>8} {'etapa':>14} {'mediana (ms)':>13} {'mín (ms)':>10} {'máx (ms)':>10}")
+    for n_rows in args.rows:
+        results = run_size(n_rows, args.repeat)
+        report["results"][str(n_rows)] = results
+        for phase, stats in results.items():
+            print(f"{n_rows:>8} {phase:>14} {stats['median_ms']:>13.1f} {stats['min_ms']:>10.1f} "
+                  f"{stats['max_ms']:>10.1f}")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit or 'sem-commit'}{'-dirty' if dirty else ''}.json")
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
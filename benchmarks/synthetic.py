@@ -0,0 +1,96 @@
+"""
+Gerador de dados sintéticos no formato das abas Cronograma e Usuários.
+
+As cardinalidades seguem a planilha real: poucos Setores com tamanhos
+desiguais, um Responsável (e um E-mail) para cada ~15 metas, com mais metas
+para alguns, um gestor (Responsável Área) por Setor e doze Referências por
+ano de histórico. Funciona de 1 mil a 500 mil linhas.
+"""
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.storage import CRONOGRAMA_COLUMNS, ENTREGAS, USERS_COLUMNS
+
+STATUS_VALIDACAO = ["", "Pendente", "Validado", "Reprovado"]
+AVALIACOES = ["", "Atende", "Não atende", "Parcial"]
+TIPOS_USUARIO = ["Gestor | Avaliador", "Avaliador"]
+
+N_SETORES = 25
+METAS_POR_PESSOA = 15
+LINHAS_POR_ANO = 100_000
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elaine", "Fábio", "Gabriela", "Heitor", "Isabela", "João",
+         "Karina", "Lucas", "Marina", "Nicolas", "Olívia", "Paulo", "Renata", "Sérgio", "Tatiane", "Vítor"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa", "Ferreira", "Almeida",
+              "Ribeiro", "Carvalho", "Gomes", "Martins", "Araújo", "Rocha", "Barbosa"]
+
+
+def _skewed(rng, n, size, exponent=1.1):
+    """Sorteia `size` índices em [0, n) com pesos de Zipf (poucos valores muito frequentes)"""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return rng.choice(n, size=size, p=weights / weights.sum())
+
+
+def _people(n_people):
+    """Nomes e e-mails únicos para `n_people` pessoas"""
+    names, emails = [], []
+    for i in range(n_people):
+        first = NOMES[i % len(NOMES)]
+        last = SOBRENOMES[(i // len(NOMES)) % len(SOBRENOMES)]
+        suffix = i // (len(NOMES) * len(SOBRENOMES))
+        names.append(f"{first} {last}" + (f" {suffix + 1}" if suffix else ""))
+        login = unicodedata.normalize("NFKD", f"{first}.{last}".lower()).encode("ascii", "ignore").decode()
+        emails.append(f"{login}{suffix or ''}@aguiaflorestal.com.br")
+    return names, emails
+
+
+def make_cronograma(n_rows, seed=0):
+    """Gera um Cronograma sintético com `n_rows` linhas"""
+    rng = np.random.default_rng(seed)
+    n_people = max(5, n_rows // METAS_POR_PESSOA)
+    names, emails = _people(n_people)
+
+    # Cada pessoa pertence a um Setor; o gestor do Setor é o Responsável Área
+    person_setor = _skewed(rng, N_SETORES, n_people)
+    people = _skewed(rng, n_people, n_rows, exponent=0.6)
+    setores = person_setor[people]
+
+    years = 1 + n_rows // LINHAS_POR_ANO
+    referencias = [f"{2025 - years + 1 + m // 12}-{m % 12 + 1:02d}" for m in range(12 * years)]
+    deadlines = pd.date_range(f"{2025 - years + 1}-01-31", periods=12 * years, freq="ME").strftime("%d/%m/%Y")
+    n_metas = max(1, n_rows // 3)
+
+    data = {
+        "key": [f"K{i:07d}" for i in range(n_rows)],
+        "Referência": np.asarray(referencias)[rng.integers(0, len(referencias), n_rows)],
+        "Setor": [f"Setor {s + 1}" for s in setores],
+        "Responsável": np.asarray(names)[people],
+        "Responsável Área": [f"Gestor {s + 1}" for s in setores],
+        "E-mail": np.asarray(emails)[people],
+        "Descrição Meta": [f"Meta {i} - reduzir custo operacional" for i in rng.integers(0, n_metas, n_rows)],
+    }
+    for i in ENTREGAS:
+        data[f"{i}º Entrega"] = rng.choice(np.append([""], deadlines), n_rows)
+    for i in ENTREGAS:
+        data[f"{i}º Avaliação"] = rng.choice(AVALIACOES, n_rows)
+    for i in ENTREGAS:
+        data[f"Validação {i}º Entrega"] = rng.choice(STATUS_VALIDACAO, n_rows)
+    for i in ENTREGAS:
+        data[f"Doc{i}"] = ""
+    return pd.DataFrame(data, columns=CRONOGRAMA_COLUMNS)
+
+
+def make_usuarios(cronograma, seed=0):
+    """Usuários (um por E-mail do Cronograma), com senha igual ao login"""
+    rng = np.random.default_rng(seed)
+    emails = pd.unique(cronograma["E-mail"])
+    logins = [e.split("@")[0] for e in emails]
+    return pd.DataFrame({
+        "Login": logins,
+        "Email": emails,
+        "Senha": logins,
+        "Tipo de Usuário": rng.choice(TIPOS_USUARIO, len(emails), p=[0.2, 0.8]),
+        "Data de Cadastro": "2025-01-01 08:00:00",
+    }, columns=USERS_COLUMNS)
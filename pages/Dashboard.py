@@ -0,0 +1,71 @@
+import time
+import streamlit as st
+from utils.cronograma import load_cronograma
+from utils.progress import get_progress
+from utils.storage import ENTREGAS
+from utils.debug_panel import render_debug_panel
+from utils.sessions import ensure_session
+
+run_started = time.time()
+
+GESTOR = "Gestor | Avaliador"
+TODAS = "Todas"
+
+# Verificação de login (restaurado pelo token da URL ao recarregar) e de perfil
+if not ensure_session():
+    st.warning("⚠️ Você precisa estar logado para acessar esta página.")
+    st.stop()
+
+if st.session_state.get("tipo_usuario") != GESTOR:
+    st.warning("⚠️ O painel de andamento é exclusivo para gestores.")
+    st.stop()
+
+col1, col2 = st.columns([10, 1])
+with col2:
+    if st.button("⬅️ Voltar", key="voltar_topo"):
+        st.switch_page("app.py")
+
+with col1:
+    st.title("📊 Andamento das Entregas")
+
+# Agregados da versão atual do Cronograma (corrigidos a cada edição salva)
+cronograma = load_cronograma()
+if cronograma.frame is None or cronograma.frame.empty:
+    st.warning("A planilha está vazia!")
+    st.stop()
+progress = get_progress(cronograma.version, cronograma.frame)
+
+# Filtros do painel
+cols = st.columns(3)
+with cols[0]:
+    referencias = progress.table("Referência").index.tolist()
+    referencia = st.selectbox("Referência", [TODAS] + referencias[::-1])
+with cols[1]:
+    entrega = st.selectbox("Entrega", [TODAS] + [f"{i}º Entrega" for i in ENTREGAS])
+with cols[2]:
+    by = st.radio("Agrupar por", ["Setor", "Responsável", "Referência"], horizontal=True)
+
+referencia = None if referencia == TODAS else referencia
+entrega = None if entrega == TODAS else int(entrega.split("º")[0])
+
+# Totais
+totals = progress.by_entrega(referencia)
+if entrega is not None:
+    totals = totals.iloc[[entrega - 1]]
+previstas, avaliadas, validadas = (int(totals[m].sum()) for m in ["Previstas", "Avaliadas", "Validadas"])
+metrics = st.columns(3)
+metrics[0].metric("Entregas previstas", previstas)
+metrics[1].metric("Avaliadas", avaliadas, f"{100 * avaliadas / previstas:.1f}%" if previstas else None,
+                  delta_color="off")
+metrics[2].metric("Validadas", validadas, f"{100 * validadas / previstas:.1f}%" if previstas else None,
+                  delta_color="off")
+
+st.markdown("---")
+st.markdown(f"### Por {by}")
+st.dataframe(progress.table(by, referencia, entrega), width="stretch")
+
+if entrega is None:
+    st.markdown("### Por entrega")
+    st.dataframe(progress.by_entrega(referencia), width="stretch")
+
+render_debug_panel(run_started)
@@ -1,12 +1,16 @@
+import time
 import streamlit as st
 import pandas as pd
-from utils.google_sheets import read_sheet_to_dataframe
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from utils.config import SPREADSHEET_URL, WORKSHEET_NAME
+from utils.storage import get_backend
+from utils.write_queue import enqueue_cell_update, get_write_queue
+from utils.debug_panel import render_debug_panel
+from utils.sessions import ensure_session
 
-# URL da planilha e aba
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1VZpV97NIhd16jAyzMpVE_8VhSs-bSqi4DXmySsx2Kc4/edit#gid=761491838"
-WORKSHEET_NAME = "Cronograma"
+run_started = time.time()
+
+# Mantém o token da sessão na URL (recarregar não pede novo login)
+ensure_session()
 
 st.markdown("<style>div.block-container{padding-top:2rem;}</style>", unsafe_allow_html=True)
 
@@ -15,9 +19,17 @@ if "selected_row_index" not in st.session_state:
     st.error("Nenhuma linha selecionada.")
     st.stop()
 
-df = read_sheet_to_dataframe(SPREADSHEET_URL, WORKSHEET_NAME)
+# Lê apenas a linha selecionada e as colunas usadas nesta página
 row_index = st.session_state.selected_row_index
-row = df.iloc[row_index]
+df = get_backend().read_rows(WORKSHEET_NAME, row_index, row_index + 1,
+                             columns=["key", "Descrição Meta", "2º Avaliação", "Doc2"])
+# Inclui edições ainda na fila de escrita
+df = get_write_queue().overlay(df, SPREADSHEET_URL, WORKSHEET_NAME)
+row = df.loc[row_index]
+# Edição anterior que a planilha não aceitou (linha ou coluna não encontrada)
+if (str(row['key']), '2º Avaliação') in get_write_queue().stuck_cells(SPREADSHEET_URL, WORKSHEET_NAME):
+    st.warning("⚠️ A última edição desta avaliação não foi gravada na planilha (linha ou coluna não encontrada). "
+               "Confira a planilha e salve de novo.")
 
 col1, col2 = st.columns([10, 1])
 with col2:
@@ -40,17 +52,9 @@ with st.form("form_avaliacao"):
     submitted = st.form_submit_button("💾 Salvar")
 
     if submitted:
-        # Atualiza valor no Google Sheets
-        def update_cell_in_sheet(df, url, worksheet_name, row_index, new_value):
-            scope = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-            creds = ServiceAccountCredentials.from_json_keyfile_name('credentials/service_account.json', scope)
-            client = gspread.authorize(creds)
-            sheet = client.open_by_url(url)
-            worksheet = sheet.worksheet(worksheet_name)
-            worksheet.update_cell(row_index + 2, df.columns.get_loc('2º Avaliação') + 1, new_value)
-
+        # Grava na fila de escrita; o envio ao Google Sheets é feito em segundo plano
         df.at[row_index, '2º Avaliação'] = new_value
-        update_cell_in_sheet(df, SPREADSHEET_URL, WORKSHEET_NAME, row_index, new_value)
+        enqueue_cell_update(SPREADSHEET_URL, WORKSHEET_NAME, row['key'], '2º Avaliação', new_value)
         st.success("✅ Dados atualizados com sucesso!")
 
         st.stop()
@@ -62,43 +66,15 @@ st.markdown("### 📎 Upload de Documento")
 uploaded_file = st.file_uploader("Selecione um arquivo para fazer upload (PDF, DOCX, etc.)", type=["pdf", "docx", "doc", "xlsx"])
 
 if uploaded_file is not None:
-    import io
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaIoBaseUpload
-
-    def upload_file_to_drive(file, filename, mimetype):
-        scope = ['https://www.googleapis.com/auth/drive']
-        creds = ServiceAccountCredentials.from_json_keyfile_name('credentials/service_account.json', scope)
-        service = build('drive', 'v3', credentials=creds)
-
-        file_metadata = {'name': filename, 'parents': ['1g-pnfUQV70C7cs5UjWtnRHkfIAYT959t']}  # Substitua com o ID da pasta
-        media = MediaIoBaseUpload(io.BytesIO(file.read()), mimetype=mimetype)
-
-        uploaded = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
-        
-        # Torna o arquivo compartilhável
-        file_id = uploaded['id']
-        service.permissions().create(fileId=file_id, body={"role": "reader", "type": "anyone"}).execute()
-        link = f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
-        return link
-
     if st.button("📤 Enviar Documento"):
         filename = uploaded_file.name
         mimetype = uploaded_file.type
         try:
-            drive_link = upload_file_to_drive(uploaded_file, filename, mimetype)
+            drive_link = get_backend().upload_document(uploaded_file, filename, mimetype)
 
             # Atualiza o link na planilha
-            def update_doc_link(df, url, worksheet_name, row_index, doc_link):
-                scope = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-                creds = ServiceAccountCredentials.from_json_keyfile_name('credentials/service_account.json', scope)
-                client = gspread.authorize(creds)
-                sheet = client.open_by_url(url)
-                worksheet = sheet.worksheet(worksheet_name)
-                worksheet.update_cell(row_index + 2, df.columns.get_loc('Doc2') + 1, doc_link)
-
             df.at[row_index, 'Doc2'] = drive_link
-            update_doc_link(df, SPREADSHEET_URL, WORKSHEET_NAME, row_index, drive_link)
+            get_backend().update_cells(WORKSHEET_NAME, [(row['key'], 'Doc2', drive_link)])
             st.success("✅ Documento enviado e link atualizado com sucesso!")
         except Exception as e:
             st.error(f"❌ Erro ao enviar documento: {e}")
@@ -119,3 +95,5 @@ if pd.notna(row.get("Doc2")) and "drive.google.com" in row["Doc2"]:
         """, height=500)
     else:
         st.warning("⚠️ Link inválido para visualização.")
+
+render_debug_panel(run_started)
@@ -1,39 +1,20 @@
 import streamlit as st
-import pandas as pd
-from utils.google_sheets import read_sheet_to_dataframe
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
-
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1VZpV97NIhd16jAyzMpVE_8VhSs-bSqi4DXmySsx2Kc4/edit#gid=0"
-USERS_SHEET = "Usuários"
-
-# --- Funções ---
-def append_user_to_sheet(new_user):
-    scope = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_name('credentials/service_account.json', scope)
-    client = gspread.authorize(creds)
-    sheet = client.open_by_url(SPREADSHEET_URL)
-    worksheet = sheet.worksheet(USERS_SHEET)
-    worksheet.append_row(new_user)
-
-def authenticate_user(login, senha, df_users):
-    user = df_users[(df_users['Login'] == login) & (df_users['Senha'] == senha)]
-    if not user.empty:
-        return user.iloc[0].to_dict()
-    return None
+from auth2 import authenticate_user, append_user_to_sheet
+from utils.users import get_user_directory
+from utils.sessions import end_session, ensure_session, start_session
 
 # --- Inicialização da sessão ---
 if "logged_in" not in st.session_state:
     st.session_state["logged_in"] = False
-
-# --- Lê dados da planilha ---
-df_users = read_sheet_to_dataframe(SPREADSHEET_URL, USERS_SHEET)
+ensure_session()
 
 st.title("🔐 Portal de Acesso")
 
 # --- Conteúdo baseado no estado de login ---
 if not st.session_state["logged_in"]:
+    # Usuários só são carregados aqui (login e cadastro), com cache por versão da aba
+    users = get_user_directory()
     modo = st.radio("Escolha uma opção:", ["Login", "Cadastrar Novo Usuário"])
 
     if modo == "Login":
@@ -41,12 +22,13 @@ if not st.session_state["logged_in"]:
         senha = st.text_input("Senha", type="password")
 
         if st.button("🔓 Entrar"):
-            user_info = authenticate_user(login, senha, df_users)
+            user_info = authenticate_user(login, senha, users)
             if user_info:
                 st.session_state["logged_in"] = True
                 st.session_state["user_info"] = user_info
                 st.session_state["email"] = user_info["Email"]
                 st.session_state["tipo_usuario"] = user_info["Tipo de Usuário"]
+                start_session(user_info)
                 st.success(f"Bem-vindo, {user_info['Login']}!")
 
                 st.switch_page("app.py")  # ⬅️ muda aqui
@@ -63,7 +45,7 @@ if not st.session_state["logged_in"]:
             submit = st.form_submit_button("✅ Cadastrar")
 
             if submit:
-                if novo_login in df_users['Login'].values:
+                if novo_login in users:
                     st.warning("⚠️ Este login já existe.")
                 else:
                     data = datetime.today().strftime("%Y-%m-%d %H:%M:%S")
@@ -76,5 +58,6 @@ else:
     st.write("Tipo de usuário:", user_info["Tipo de Usuário"])
 
     if st.button("🚪 Sair"):
+        end_session()
         st.session_state.clear()
-        st.experimental_rerun()
+        st.rerun()
@@ -0,0 +1,38 @@
+"""
+Testes da leitura projetada de `read_sheet_to_dataframe` com a planilha
+simulada de `benchmarks.fake_sheets`.
+"""
+from benchmarks.fake_sheets import FakeWorksheet, install_fake_connection
+from utils.google_sheets import _header_cache, read_sheet_to_dataframe
+
+URL = "https://docs.google.com/spreadsheets/d/FAKE/edit"
+
+
+def test_cabecalho_em_cache_desatualizado_e_resolvido_de_novo():
+    _header_cache.clear()
+    worksheet = FakeWorksheet("Aba", [["key", "A", "B"], ["1", "a1", "b1"], ["2", "a2", "b2"]])
+    with install_fake_connection(worksheet):
+        df = read_sheet_to_dataframe(URL, "Aba", columns=["key", "B"])
+        assert df["B"].tolist() == ["b1", "b2"]
+
+        # Coluna inserida antes de B: o cabeçalho em cache fica desatualizado
+        for line, value in zip(worksheet._values, ["Nova", "x1", "x2"]):
+            line.insert(1, value)
+        worksheet.reset_counters()
+        df = read_sheet_to_dataframe(URL, "Aba", columns=["key", "B"])
+
+    assert df["B"].tolist() == ["b1", "b2"]
+    assert df["key"].tolist() == ["1", "2"]
+    assert worksheet.calls == 2
+
+
+def test_cabecalho_inalterado_le_em_uma_chamada():
+    _header_cache.clear()
+    worksheet = FakeWorksheet("Aba", [["key", "A"], ["1", "a1"]])
+    with install_fake_connection(worksheet):
+        read_sheet_to_dataframe(URL, "Aba", columns=["A"])
+        worksheet.reset_counters()
+        df = read_sheet_to_dataframe(URL, "Aba", columns=["A"])
+
+    assert df["A"].tolist() == ["a1"]
+    assert worksheet.calls == 1
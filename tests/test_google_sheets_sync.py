@@ -0,0 +1,82 @@
+"""
+Testes de `sync_dataframe_to_sheet` / `diff_sheet_values` com a planilha
+simulada de `benchmarks.fake_sheets`.
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.fake_sheets import FakeWorksheet, install_fake_connection
+from utils.google_sheets import diff_sheet_values, sync_dataframe_to_sheet
+
+URL = "https://docs.google.com/spreadsheets/d/FAKE/edit"
+
+
+def sync(values, dataframe, **kwargs):
+    worksheet = FakeWorksheet("Aba", values)
+    with install_fake_connection(worksheet):
+        report = sync_dataframe_to_sheet(URL, "Aba", dataframe, **kwargs)
+    return worksheet, report
+
+
+def test_colunas_ausentes_do_dataframe_ficam_intactas():
+    values = [["key", "A", "B", "C"], ["1", "a1", "b1", "c1"], ["2", "a2", "b2", "c2"]]
+    dataframe = pd.DataFrame({"key": ["1", "2"], "C": ["c1", "novo"]})
+
+    worksheet, report = sync(values, dataframe)
+
+    assert worksheet._values == [["key", "A", "B", "C"], ["1", "a1", "b1", "c1"], ["2", "a2", "b2", "novo"]]
+    assert report.cells_written == 1
+    assert report.rows_deleted == 0
+
+
+def test_ordem_das_colunas_diferente_da_aba_nao_escreve_nada():
+    values = [["A", "key"], ["a1", "1"], ["a2", "2"]]
+    dataframe = pd.DataFrame({"key": ["1", "2"], "A": ["a1", "a2"]})
+
+    worksheet, report = sync(values, dataframe)
+
+    assert report.cells_written == 0
+    assert report.rows_deleted == 0
+    assert worksheet._values == values
+
+
+def test_linha_nova_segue_a_ordem_das_colunas_da_aba():
+    values = [["A", "key", "B"], ["a1", "1", "b1"]]
+    dataframe = pd.DataFrame({"key": ["1", "2"], "A": ["a1", "a2"]})
+
+    worksheet, report = sync(values, dataframe)
+
+    assert worksheet._values[2] == ["a2", "2", ""]
+    assert report.rows_appended == 1
+
+
+def test_coluna_ausente_na_aba_e_erro():
+    values = [["key", "A"], ["1", "a1"]]
+    dataframe = pd.DataFrame({"key": ["1"], "Z": ["z1"]})
+
+    with pytest.raises(ValueError):
+        diff_sheet_values(values, dataframe)
+    with pytest.raises(ValueError):
+        diff_sheet_values([["A"], ["a1"]], pd.DataFrame({"key": ["1"], "A": ["a1"]}))
+
+
+def test_write_header_acrescenta_colunas_ao_fim_do_cabecalho():
+    values = [["key", "A"], ["1", "a1"]]
+    dataframe = pd.DataFrame({"key": ["1"], "Z": ["z1"]})
+
+    worksheet, _ = sync(values, dataframe, write_header=True)
+
+    assert worksheet._values == [["key", "A", "Z"], ["1", "a1", "z1"]]
+
+
+def test_formulas_vao_como_user_entered():
+    values = [["key", "A"], ["1", "a1"]]
+    dataframe = pd.DataFrame({"key": ["1"], "A": ["=1+1"]})
+    worksheet = FakeWorksheet("Aba", values)
+    options = []
+    worksheet.batch_update = lambda data, **kwargs: options.append(kwargs.get("value_input_option"))
+
+    with install_fake_connection(worksheet):
+        sync_dataframe_to_sheet(URL, "Aba", dataframe)
+
+    assert options == ["USER_ENTERED"]
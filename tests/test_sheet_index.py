@@ -0,0 +1,39 @@
+"""
+Testes do `SheetIndex` (escritas por chave) com a planilha simulada de
+`benchmarks.fake_sheets`.
+"""
+from benchmarks.fake_sheets import FakeWorksheet, install_fake_connection
+from utils.google_sheets import get_sheet_index, invalidate_sheet_index, update_cells_by_key
+
+URL = "https://docs.google.com/spreadsheets/d/FAKE/edit"
+
+
+def make_worksheet():
+    invalidate_sheet_index(URL, "Aba")
+    return FakeWorksheet("Aba", [["key", "A"]] + [[str(i), f"a{i}"] for i in range(1, 11)])
+
+
+def test_linha_inserida_fora_do_app_nao_desloca_a_escrita():
+    worksheet = make_worksheet()
+    with install_fake_connection(worksheet):
+        get_sheet_index(URL, "Aba").refresh()
+        worksheet._values.insert(1, ["99", "x"])
+        update_cells_by_key(URL, "Aba", [("5", "A", "novo")])
+
+    assert [line for line in worksheet._values if line[0] == "5"] == [["5", "novo"]]
+    assert ["99", "x"] in worksheet._values
+
+
+def test_chaves_desconhecidas_releem_o_indice_uma_vez():
+    worksheet = make_worksheet()
+    with install_fake_connection(worksheet):
+        index = get_sheet_index(URL, "Aba")
+        index.refresh()
+        worksheet.reset_counters()
+        cells = [("3", "A", "x")] + [(f"nao-existe-{i}", "A", "x") for i in range(20)]
+        addresses = index.resolve(worksheet, [(key, column) for key, column, _ in cells])
+
+    assert addresses[0] == "B4"
+    assert addresses[1:] == [None] * 20
+    # Uma releitura (cabeçalho + coluna chave) e uma conferência das linhas
+    assert worksheet.calls == 3
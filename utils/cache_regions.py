@@ -0,0 +1,142 @@
+"""
+Regiões de cache nomeadas e versionadas, uma por planilha e aba.
+
+Cada região guarda os valores carregados pela versão da aba (`VersionGate`)
+e por uma geração que só o botão Atualizar incrementa. Assim:
+
+- atualizar invalida só a região pedida (ex.: Cronograma), não os demais
+  caches do processo;
+- cada usuário pode pedir atualização no máximo a cada `REFRESH_INTERVAL`
+  segundos;
+- a nova versão é carregada uma única vez; as sessões que chegam durante a
+  carga continuam recebendo o último valor carregado em vez de esperar.
+
+O carregador recebe `loader(version, fresh)`: `fresh` é True na primeira
+carga depois de uma atualização, para que ele ignore cópias locais (como o
+snapshot) e busque os dados na origem.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from utils.config import REFRESH_INTERVAL
+from utils.connection import spreadsheet_key
+
+
+class CacheRegion:
+    """Valores de uma aba por (versão, geração), com carga única e dados anteriores durante a carga"""
+
+    def __init__(self, name, loader, max_versions=2, clock=time.monotonic):
+        self.name = name
+        self._loader = loader
+        self.max_versions = max_versions
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+        self._loading = {}
+        self._latest = None
+        self._refreshed_by = {}
+        self.generation = 0
+
+        self.hits = 0
+        self.loads = 0
+        self.stale = 0
+        self.refreshes = 0
+        self.refreshes_limited = 0
+
+    def get(self, version):
+        """Valor da versão `version`; durante a carga dela devolve o último valor carregado"""
+        key = (version, self.generation)
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                self._values.move_to_end(key)
+                return self._values[key]
+            future = self._loading.get(key)
+            if future is not None and self._latest is not None:
+                self.stale += 1
+                return self._latest
+            owner = future is None
+            if owner:
+                future = self._loading[key] = Future()
+                fresh = self.generation > 0 and all(g != self.generation for _, g in self._values)
+        if not owner:
+            return future.result()
+
+        try:
+            value = self._loader(version, fresh)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self.loads += 1
+            self._values[key] = value
+            while len(self._values) > self.max_versions:
+                self._values.popitem(last=False)
+            self._latest = value
+            del self._loading[key]
+        future.set_result(value)
+        return value
+
+    def latest(self):
+        """Último valor carregado (None antes da primeira carga)"""
+        return self._latest
+
+    def refresh(self, user, interval=REFRESH_INTERVAL):
+        """
+        Invalida a região a pedido de `user`. Retorna 0 se invalidou ou os
+        segundos que faltam para o usuário poder pedir de novo.
+        """
+        now = self._clock()
+        with self._lock:
+            last = self._refreshed_by.get(user)
+            if last is not None and now - last < interval:
+                self.refreshes_limited += 1
+                return interval - (now - last)
+            self._refreshed_by[user] = now
+            self.generation += 1
+            self.refreshes += 1
+            return 0
+
+    def reset(self):
+        """Descarta todos os valores (benchmarks e testes)"""
+        with self._lock:
+            self._values.clear()
+            self._latest = None
+            self._refreshed_by.clear()
+
+    def report(self):
+        return {
+            "region": self.name,
+            "generation": self.generation,
+            "versions": [version for version, _ in self._values],
+            "hits": self.hits,
+            "loads": self.loads,
+            "stale": self.stale,
+            "refreshes": self.refreshes,
+            "refreshes_limited": self.refreshes_limited,
+        }
+
+
+_regions = {}
+_regions_lock = threading.Lock()
+
+
+def get_cache_region(url, tab, loader, max_versions=2):
+    """Retorna a região compartilhada da aba `tab` da planilha `url` (criada no 1º uso)"""
+    name = f"{spreadsheet_key(url)}/{tab}"
+    with _regions_lock:
+        if name not in _regions:
+            _regions[name] = CacheRegion(name, loader, max_versions)
+        return _regions[name]
+
+
+def reset_cache_regions():
+    """Descarta os valores de todas as regiões (benchmarks e testes)"""
+    with _regions_lock:
+        regions = list(_regions.values())
+    for region in regions:
+        region.reset()
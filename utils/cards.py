@@ -0,0 +1,92 @@
+"""
+HTML dos cards de resultado do painel.
+
+`cards_html` monta o HTML de todos os cards de uma página com operações
+vetorizadas do pandas (concatenação de colunas inteiras, sem laço em Python
+por linha), com os valores escapados. Cada card (cabeçalho, quadro de
+status e as seis entregas) vira um único elemento; só os botões de edição
+continuam sendo widgets, numa linha alinhada à grade do card
+(`render_cards`).
+"""
+import pandas as pd
+import streamlit as st
+
+from utils.schema import DATE_FORMAT
+from utils.storage import ENTREGAS
+
+# Estilos dos cards (incluídos uma vez no <style> da página)
+CARD_CSS = """
+        .ppr-card {
+            display: grid;
+            grid-template-columns: 4fr repeat(6, 1fr);
+            gap: 1rem;
+            margin-top: 10px;
+        }
+        .ppr-card .subheader-style {
+            grid-column: 1 / -1;
+        }
+        .entrega-box {
+            border: 1px solid #ccc;
+            border-radius: 10px;
+            padding: 16px;
+            box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
+            height: 180px;
+            display: flex;
+            flex-direction: column;
+            justify-content: space-between;
+            overflow: auto;
+        }
+        .entrega-box p {
+            margin: 0;
+        }
+"""
+
+STATUS_FIELDS = ["Referência", "Setor", "Responsável", "Responsável Área", "E-mail"]
+
+_ESCAPES = [("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")]
+
+
+def escaped(series):
+    """Coluna como texto de exibição escapado para HTML (datas dd/mm/aaaa, vazios como '')"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime(DATE_FORMAT)
+    else:
+        text = series.astype(object).where(series.notna(), "").astype(str)
+    text = text.fillna("").astype(object)
+    for char, entity in _ESCAPES:
+        if text.str.contains(char, regex=False).any():
+            text = text.str.replace(char, entity, regex=False)
+    return text
+
+
+def cards_html(frame):
+    """Series {índice da linha: HTML do card} para as linhas de `frame`"""
+    if frame.empty:
+        return pd.Series([], index=frame.index, dtype=object)
+
+    def col(name):
+        return escaped(frame[name]) if name in frame.columns else pd.Series("", index=frame.index, dtype=object)
+
+    html = "<div class='ppr-card'><div class='subheader-style'>📑 " + col("Descrição Meta") + "</div>"
+    html += "<div class='status-box'>"
+    for name in STATUS_FIELDS:
+        html += f"<p><strong>{name}:</strong> " + col(name) + "</p>"
+    html += "</div>"
+    for i in ENTREGAS:
+        html += (f"<div class='entrega-box'><p><strong>{i}º Entrega:</strong> " + col(f"{i}º Entrega")
+                 + "</p><p><strong>→ </strong> " + col(f"{i}º Avaliação")
+                 + "</p><p><strong>Status: </strong> " + col(f"Validação {i}º Entrega") + "</p></div>")
+    return html + "</div>"
+
+
+def render_cards(frame):
+    """Desenha os cards de `frame` com os botões que abrem as páginas de Entrega"""
+    for index, html in cards_html(frame).items():
+        st.markdown(html, unsafe_allow_html=True)
+        buttons = st.columns([4, 1, 1, 1, 1, 1, 1])
+        for i in ENTREGAS:
+            with buttons[i]:
+                if st.button(f"✏️ {i}º", key=f"editar_{i}_entrega_{index} Entrega"):
+                    st.session_state.selected_row_index = index
+                    st.switch_page(f"pages/Entrega{i}.py")
+        st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
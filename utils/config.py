@@ -0,0 +1,63 @@
+"""
+Configuração central do app.
+
+Cada opção pode ser sobrescrita pela variável de ambiente `PPR_<NOME>` ou
+pela seção `[ppr]` do `.streamlit/secrets.toml`.
+"""
+import os
+
+import streamlit as st
+
+
+def get_setting(name, default=None):
+    """Lê uma opção de PPR_<NOME>, st.secrets['ppr'][nome] ou o padrão"""
+    value = os.environ.get(f"PPR_{name.upper()}")
+    if value is not None:
+        return value
+    try:
+        return st.secrets["ppr"][name]
+    except Exception:
+        return default
+
+
+# --- Planilha ---
+SPREADSHEET_URL = get_setting(
+    "spreadsheet_url",
+    "https://docs.google.com/spreadsheets/d/1VZpV97NIhd16jAyzMpVE_8VhSs-bSqi4DXmySsx2Kc4/edit#gid=0")
+USERS_SHEET = "Usuários"
+WORKSHEET_NAME = "Cronograma"
+
+# Colunas de Usuários necessárias para login e cadastro
+USERS_LOGIN_COLUMNS = ["Login", "Senha", "Email", "Tipo de Usuário"]
+
+DRIVE_FOLDER_ID = get_setting("drive_folder_id", "1g-pnfUQV70C7cs5UjWtnRHkfIAYT959t")
+
+# --- Armazenamento ---
+CACHE_DIR = get_setting("cache_dir", ".cache")
+# 'sheets' (Google Sheets/Drive), 'sqlite' (arquivo local) ou 'memory' (SQLite em memória)
+STORAGE_BACKEND = get_setting("storage_backend", "sheets")
+SQLITE_PATH = get_setting("sqlite_path", os.path.join(CACHE_DIR, "ppr.sqlite3"))
+UPLOAD_DIR = get_setting("upload_dir", os.path.join(CACHE_DIR, "uploads"))
+
+# --- Instrumentação ---
+# Logins que podem abrir o painel de depuração (?debug), separados por vírgula
+ADMIN_USERS = [u.strip() for u in str(get_setting("admin_users", "")).split(",") if u.strip()]
+# Arquivo no formato texto do Prometheus (vazio = desligado) e intervalo de gravação
+METRICS_FILE = get_setting("metrics_file", "")
+METRICS_INTERVAL = float(get_setting("metrics_interval", 15))
+# Porta local do endpoint /metrics (vazio = desligado)
+METRICS_PORT = get_setting("metrics_port", "")
+
+# --- Painel ---
+# Cards de resultado por página (a página inicial do painel)
+RESULTS_PAGE_SIZE = int(get_setting("results_page_size", 20))
+# Intervalo mínimo, por usuário, entre cliques em "Atualizar" (segundos)
+REFRESH_INTERVAL = float(get_setting("refresh_interval", 30))
+
+# --- Sessões ---
+# Sessões de login guardadas no servidor (sobrevivem ao recarregar a página)
+SESSION_DB = get_setting("session_db", os.path.join(CACHE_DIR, "sessions.sqlite3"))
+# Validade da sessão em segundos
+SESSION_TTL = float(get_setting("session_ttl", 8 * 3600))
+# Chave de assinatura dos tokens (vazio = gerada e guardada em CACHE_DIR/session_secret)
+SESSION_SECRET = get_setting("session_secret", "")
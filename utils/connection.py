@@ -0,0 +1,199 @@
+"""
+Camada de conexão compartilhada com o Google Sheets e o Google Drive.
+
+Mantém um único cliente autorizado por processo (com a sua sessão HTTP),
+renova o token em segundo plano antes de expirar e guarda em cache os
+objetos de planilha e de aba por URL e nome da aba, evitando refazer
+OAuth e `open_by_url` a cada clique. Toda requisição HTTP do gspread passa
+pelo agendador de cota (`utils.scheduler`).
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import gspread
+import streamlit as st
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+from gspread.http_client import HTTPClient
+
+from utils.metrics import note_bytes
+from utils.scheduler import get_scheduler
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+CREDENTIALS_FILE = 'credentials/service_account.json'
+
+# Renova o token quando faltar menos que isso para expirar
+REFRESH_MARGIN = timedelta(minutes=5)
+# Intervalo entre verificações da thread de renovação (segundos)
+REFRESH_CHECK_INTERVAL = 60
+
+
+def load_credentials():
+    """Carrega as credenciais do service account (st.secrets ou arquivo local)"""
+    try:
+        info = dict(st.secrets["google_sheets"])
+    except Exception:
+        info = None
+
+    if info:
+        return Credentials.from_service_account_info(info, scopes=SCOPES)
+    return Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
+
+
+def spreadsheet_key(url):
+    """Normaliza a URL para o ID da planilha (ignora #gid e parâmetros)"""
+    try:
+        return gspread.utils.extract_id_from_url(url)
+    except gspread.exceptions.NoValidUrlKeyFound:
+        return url
+
+
+class ScheduledHTTPClient(HTTPClient):
+    """
+    Cliente HTTP do gspread que respeita a cota e repete erros 429/5xx.
+    Só leituras (GET) são repetidas em qualquer erro transitório; escritas
+    como append e deleteDimension não podem ser reenviadas depois de um 5xx.
+    """
+
+    def request(self, method, endpoint, *args, **kwargs):
+        send = super().request
+        is_read = method.lower() == "get"
+        response = get_scheduler().call(lambda: send(method, endpoint, *args, **kwargs),
+                                        kind="read" if is_read else "write", idempotent=is_read)
+        note_bytes(len(response.content or b""))
+        return response
+
+
+class SheetsConnection:
+    """Cliente gspread único com cache de planilhas e abas"""
+
+    def __init__(self, credentials_loader=load_credentials):
+        self._credentials_loader = credentials_loader
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._client = None
+        # httplib2 não é thread-safe: um serviço do Drive por thread
+        self._drive = threading.local()
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._stop = threading.Event()
+        self._refresher = None
+
+    # --- Cliente e credenciais ---
+    @property
+    def client(self):
+        """Retorna o cliente autorizado, criando-o na primeira chamada"""
+        with self._lock:
+            if self._client is None:
+                self._credentials = self._credentials_loader()
+                self._credentials.refresh(Request())
+                self._client = gspread.authorize(self._credentials, http_client=ScheduledHTTPClient)
+                self._start_refresher()
+            return self._client
+
+    @property
+    def credentials(self):
+        """Credenciais usadas pelo cliente compartilhado"""
+        self.client  # garante que o cliente foi autorizado
+        return self._credentials
+
+    @property
+    def drive_service(self):
+        """Serviço do Drive v3 da thread atual, com as mesmas credenciais do cliente"""
+        service = getattr(self._drive, "service", None)
+        if service is None:
+            from googleapiclient.discovery import build
+            service = build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+            self._drive.service = service
+        return service
+
+    def refresh_if_needed(self):
+        """Renova o token se estiver perto de expirar"""
+        with self._lock:
+            creds = self._credentials
+            if creds is None:
+                return False
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            if creds.expiry is not None and creds.expiry - now > REFRESH_MARGIN:
+                return False
+            creds.refresh(Request())
+            return True
+
+    def _start_refresher(self):
+        if self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="sheets-token-refresher", daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(REFRESH_CHECK_INTERVAL):
+            try:
+                self.refresh_if_needed()
+            except Exception as e:
+                print(f"Erro ao renovar o token: {e}")
+
+    def close(self):
+        """Encerra a thread de renovação e descarta o cliente"""
+        with self._lock:
+            self._stop.set()
+            self._stop = threading.Event()
+            self._refresher = None
+            if self._client is not None:
+                self._client.http_client.session.close()
+            self._client = None
+            self._credentials = None
+            self._drive = threading.local()
+            self.invalidate()
+
+    # --- Cache de planilhas e abas ---
+    def open_spreadsheet(self, url):
+        """Retorna a planilha da URL, usando o cache quando possível"""
+        key = spreadsheet_key(url)
+        with self._lock:
+            spreadsheet = self._spreadsheets.get(key)
+            if spreadsheet is None:
+                spreadsheet = self.client.open_by_key(key)
+                self._spreadsheets[key] = spreadsheet
+            return spreadsheet
+
+    def open_worksheet(self, url, worksheet_name):
+        """Retorna a aba `worksheet_name` da planilha, usando o cache quando possível"""
+        key = (spreadsheet_key(url), worksheet_name)
+        with self._lock:
+            worksheet = self._worksheets.get(key)
+            if worksheet is None:
+                worksheet = self.open_spreadsheet(url).worksheet(worksheet_name)
+                self._worksheets[key] = worksheet
+            return worksheet
+
+    def invalidate(self, url=None, worksheet_name=None):
+        """Remove do cache as planilhas/abas indicadas (ou todas)"""
+        with self._lock:
+            if url is None:
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+                return
+            key = spreadsheet_key(url)
+            if worksheet_name is None:
+                self._spreadsheets.pop(key, None)
+                for cached in [k for k in self._worksheets if k[0] == key]:
+                    del self._worksheets[cached]
+            else:
+                self._worksheets.pop((key, worksheet_name), None)
+
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def get_connection():
+    """Retorna a conexão compartilhada do processo"""
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            _connection = SheetsConnection()
+        return _connection
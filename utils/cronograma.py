@@ -0,0 +1,74 @@
+"""
+Cronograma compartilhado por todas as sessões e páginas.
+
+`load_cronograma` devolve o `FilterEngine` (DataFrame normalizado, índice
+E-mail → linhas e filtros) da versão atual da planilha, guardado na região
+de cache do Cronograma (`utils.cache_regions`) pela versão. Na partida a
+frio usa o snapshot local e revalida em segundo plano.
+"""
+from utils.cache_regions import get_cache_region
+from utils.config import SPREADSHEET_URL, STORAGE_BACKEND, WORKSHEET_NAME
+from utils.filters import FilterEngine
+from utils.freshness import get_version_gate
+from utils.partition import PartitionedFrame
+from utils.schema import compact_cronograma
+from utils.snapshot import load_snapshot, revalidate_in_background, snapshot_name
+from utils.storage import get_backend
+
+CRONOGRAMA_SNAPSHOT = snapshot_name(SPREADSHEET_URL, WORKSHEET_NAME)
+# Só o backend do Sheets grava snapshots; os backends locais já leem do disco
+USE_SNAPSHOT = STORAGE_BACKEND == "sheets"
+
+
+def _snapshot(version=None):
+    return load_snapshot(CRONOGRAMA_SNAPSHOT, version=version) if USE_SNAPSHOT else None
+
+
+def _engine(df, version):
+    return FilterEngine(PartitionedFrame(compact_cronograma(df)), version=version)
+
+
+def _load(version, fresh=False):
+    # Snapshot local da mesma versão evita o download (ex.: após reinício),
+    # exceto logo após o botão Atualizar, que sempre baixa de novo
+    # (só os metadados são lidos se o snapshot for de outra versão)
+    snapshot = None if fresh or version is None else _snapshot(version)
+    if snapshot is not None:
+        return _engine(snapshot.data, version)
+    df = get_version_gate(WORKSHEET_NAME).fetch(lambda: get_backend().read_tab(WORKSHEET_NAME))
+    return _engine(df, version)
+
+
+CRONOGRAMA_REGION = get_cache_region(SPREADSHEET_URL, WORKSHEET_NAME, _load)
+
+
+def fetch_cronograma(version):
+    """
+    Cronograma completo e normalizado, compartilhado por todas as sessões
+    (indexado pela versão da planilha), com o índice E-mail → linhas e o
+    motor dos filtros em cascata.
+    """
+    return CRONOGRAMA_REGION.get(version)
+
+
+def load_cronograma():
+    """Cronograma completo (sem filtro de usuário) com o índice por E-mail e os filtros"""
+    gate = get_version_gate(WORKSHEET_NAME)
+    snapshot = _snapshot() if gate.current is None else None
+    if snapshot is not None:
+        # Partida a frio: mostra o snapshot e revalida em segundo plano
+        revalidate_in_background(lambda: fetch_cronograma(gate.version()))
+        return _engine(snapshot.data, snapshot.version)
+    # Consulta barata de versão: só baixa de novo se a planilha mudou
+    return fetch_cronograma(gate.version())
+
+
+def refresh_cronograma(user):
+    """
+    Botão Atualizar: invalida só a região do Cronograma e força nova consulta
+    de versão. Retorna 0 ou os segundos até `user` poder atualizar de novo.
+    """
+    wait = CRONOGRAMA_REGION.refresh(user)
+    if not wait:
+        get_version_gate(WORKSHEET_NAME).expire()
+    return wait
@@ -0,0 +1,45 @@
+"""
+Painel de depuração das chamadas de armazenamento feitas na execução atual
+do script. Aparece ao final da página quando a URL tem `?debug` e o login
+do usuário está em `ADMIN_USERS`.
+"""
+import pandas as pd
+import streamlit as st
+
+from utils.config import ADMIN_USERS
+from utils.metrics import get_metrics, session_id
+
+
+def debug_enabled():
+    """True se a página foi aberta com ?debug por um administrador"""
+    login = st.session_state.get("user_info", {}).get("Login")
+    return "debug" in st.query_params and login in ADMIN_USERS
+
+
+def render_debug_panel(since, extra=None):
+    """
+    Mostra as chamadas desta sessão iniciadas a partir de `since` (time.time()
+    do início da execução) e, opcionalmente, informações extras {rótulo: valor}.
+    """
+    if not debug_enabled():
+        return
+    calls = get_metrics().recent(session=session_id(), since=since)
+    with st.expander(f"🛠️ Depuração: {len(calls)} chamadas nesta execução", expanded=True):
+        for label, value in (extra or {}).items():
+            st.caption(f"{label}: {value}")
+        if not calls:
+            st.caption("Nenhuma chamada ao armazenamento (tudo veio do cache).")
+            return
+        table = pd.DataFrame([{
+            "operação": c.op,
+            "aba": c.tab or "",
+            "linhas": c.rows,
+            "células": c.cells,
+            "bytes": c.bytes,
+            "latência (ms)": round(c.latency * 1000, 1),
+            "retentativas": c.retries,
+            "erro": c.error or "",
+        } for c in calls])
+        st.dataframe(table, hide_index=True)
+        st.caption(f"Total: {table['latência (ms)'].sum():.1f} ms, {table['bytes'].sum()} bytes, "
+                   f"{table['retentativas'].sum()} retentativas")
@@ -0,0 +1,169 @@
+"""
+Motor dos filtros em cascata do painel ("Filtros Avançados").
+
+Construído uma vez por versão do Cronograma (junto com o DataFrame
+compartilhado), guarda para cada coluna filtrável os códigos de cada linha
+e o índice invertido valor → posições das linhas (ordenadas). As opções de
+cada selectbox e o resultado final saem de interseções dessas posições,
+sem copiar o DataFrame; só o resultado final vira DataFrame (um `take`).
+
+A busca (`search`) usa um `SearchIndex` sobre os mesmos valores, construído
+no primeiro uso. Opções, resultados da busca e posições (também já ordenadas para a paginação dos resultados) são
+memorizadas pela tupla (usuário, seleções anteriores), então estados de
+filtro repetidos não custam nada.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.partition import PartitionedFrame, normalize_key
+from utils.search import GOAL_COLUMN, PEOPLE_COLUMNS, SearchIndex, fold
+
+# Colunas na ordem da cascata
+FILTER_COLUMNS = ["Referência", "Setor", "Responsável", "Descrição Meta", "Responsável Área", "E-mail"]
+ALL = "Todos"
+# Colunas da caixa de busca
+SEARCH_COLUMNS = [GOAL_COLUMN] + PEOPLE_COLUMNS
+# Colunas oferecidas na ordenação dos resultados
+SORT_COLUMNS = FILTER_COLUMNS[:5] + [f"{i}º Entrega" for i in range(1, 7)]
+MEMO_SIZE = 4096
+
+
+class _ColumnIndex:
+    """Códigos por linha e índice invertido valor → posições de uma coluna"""
+
+    def __init__(self, series):
+        keys = series.map(lambda v: "" if v is None or v != v else str(v))
+        codes, values = pd.factorize(keys)
+        self.codes = codes.astype(np.int32)
+        self.values = np.asarray(values, dtype=object)
+        self.code_of = {v: i for i, v in enumerate(self.values)}
+        # Posições agrupadas por código (ordenação estável mantém cada grupo ordenado)
+        order = np.argsort(self.codes, kind="stable")
+        bounds = np.cumsum(np.bincount(self.codes, minlength=len(self.values)))[:-1]
+        self.postings = np.split(order, bounds)
+
+    def options(self, positions, total):
+        """Valores não vazios presentes nas posições, em ordem alfabética"""
+        if len(positions) == total:
+            present = self.values
+        else:
+            present = self.values[np.unique(self.codes[positions])]
+        return sorted(v for v in present if v)
+
+    def select(self, positions, value, total):
+        code = self.code_of.get(value)
+        if code is None:
+            return positions[:0]
+        if len(positions) == total:
+            return self.postings[code]
+        return positions[self.codes[positions] == code]
+
+
+class FilterEngine:
+    """Filtros em cascata sobre o Cronograma compartilhado (uma instância por versão)"""
+
+    def __init__(self, partitioned, columns=FILTER_COLUMNS, memo_size=MEMO_SIZE, version=None):
+        if not isinstance(partitioned, PartitionedFrame):
+            partitioned = PartitionedFrame(partitioned)
+        self.partitioned = partitioned
+        self.version = version
+        self.frame = partitioned.frame
+        self.columns = [c for c in columns if self.frame is not None and c in self.frame.columns]
+        self._total = len(partitioned)
+        self._all = np.arange(self._total)
+        self._index = {c: _ColumnIndex(self.frame[c]) for c in self.columns}
+        self._memo = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+        self._search_index = None
+        self._search_lock = threading.Lock()
+
+    def _memoized(self, key, compute):
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        value = compute()
+        with self._lock:
+            self._memo[key] = value
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return value
+
+    def _base(self, user):
+        return self._all if user is None else self.partitioned.positions(user)
+
+    def positions(self, user=None, selections=()):
+        """Posições das linhas do usuário (None = todas) que atendem às seleções"""
+        selections = tuple((c, v) for c, v in dict(selections).items() if v != ALL and c in self._index)
+        user = None if user is None else normalize_key(user)
+
+        def compute():
+            if not selections:
+                return self._base(user)
+            column, value = selections[-1]
+            previous = self.positions(user, selections[:-1])
+            return self._index[column].select(previous, value, self._total)
+        return self._memoized(("positions", user, selections), compute)
+
+    def options(self, column, user=None, selections=()):
+        """Opções do selectbox `column` ("Todos" + valores) dadas as seleções anteriores"""
+        selections = tuple(dict(selections).items())
+        user = None if user is None else normalize_key(user)
+
+        def compute():
+            positions = self.positions(user, selections)
+            return [ALL] + self._index[column].options(positions, self._total)
+        return self._memoized(("options", column, user, selections), compute)
+
+    def sorted_positions(self, user=None, selections=(), sort_by=None, descending=False):
+        """Posições filtradas na ordem de `sort_by` (None = ordem da planilha); vazios por último"""
+        if sort_by is None or sort_by not in self.frame.columns:
+            return self.positions(user, selections)
+        selections = tuple(dict(selections).items())
+        user = None if user is None else normalize_key(user)
+
+        def compute():
+            positions = self.positions(user, selections)
+            values = self.frame[sort_by].take(positions).reset_index(drop=True)
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                # Texto (o Sheets mistura números e textos); vazios viram NA para ir ao fim
+                text = values.astype(str)
+                values = (values if isinstance(values.dtype, pd.CategoricalDtype) else text).where(text != "")
+            order = values.sort_values(ascending=not descending, kind="stable", na_position="last").index
+            return positions[order.to_numpy()]
+        return self._memoized(("sorted", user, selections, sort_by, descending), compute)
+
+    def search_index(self):
+        """Índice de busca desta versão (construído no primeiro uso)"""
+        with self._search_lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex({c: self._index[c].values for c in SEARCH_COLUMNS
+                                                  if c in self._index})
+        return self._search_index
+
+    def search(self, query, user=None, limit=20):
+        """Resultados da busca [Match] entre os valores presentes nas linhas do usuário"""
+        query = fold(query)
+        if not query:
+            return []
+        user = None if user is None else normalize_key(user)
+
+        def compute():
+            allowed = None
+            if user is not None:
+                positions = self._base(user)
+                allowed = {}
+                for c in SEARCH_COLUMNS:
+                    if c in self._index:
+                        allowed[c] = np.zeros(len(self._index[c].values), dtype=bool)
+                        allowed[c][self._index[c].codes[positions]] = True
+            return self.search_index().search(query, allowed, limit)
+        return self._memoized(("search", user, query, limit), compute)
+
+    def result(self, user=None, selections=()):
+        """DataFrame com as linhas filtradas (índice original preservado)"""
+        return self.frame.take(self.positions(user, selections))
@@ -0,0 +1,104 @@
+"""
+Verificação barata de mudança antes de baixar uma aba inteira.
+
+`VersionGate` consulta a versão da aba no backend (no Sheets, o campo
+`version` do arquivo no Drive; no SQLite, um contador incrementado a cada
+escrita) no máximo a cada `PROBE_INTERVAL` segundos. O app usa essa versão
+como chave de cache: enquanto ela não muda os dados vêm do cache
+indefinidamente, e assim que muda o download é refeito.
+
+O custo de cada consulta e de cada download completo é medido para
+comparação (`report`).
+"""
+import threading
+import time
+
+from utils.storage import get_backend
+
+PROBE_INTERVAL = 10.0  # segundos entre consultas de versão
+FALLBACK_TTL = 300  # se a consulta falhar, comporta-se como o antigo ttl=300
+
+
+class VersionGate:
+    """Consulta (com limite de frequência) a versão atual de uma aba"""
+
+    def __init__(self, tab, interval=PROBE_INTERVAL, backend=None, clock=time.monotonic):
+        self.tab = tab
+        self.interval = interval
+        self._backend = backend
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+
+        self.probes = 0
+        self.probe_seconds = 0.0
+        self.fetches = 0
+        self.fetch_seconds = 0.0
+
+    @property
+    def backend(self):
+        return self._backend or get_backend()
+
+    @property
+    def current(self):
+        """Última versão conhecida, sem consultar o backend (None antes da 1ª consulta)"""
+        return self._version
+
+    def version(self):
+        """Versão atual da aba (reconsulta o backend se a última tiver expirado)"""
+        with self._lock:
+            now = self._clock()
+            if self._checked_at is not None and now - self._checked_at < self.interval:
+                return self._version
+
+            started = time.perf_counter()
+            try:
+                self._version = str(self.backend.get_version(self.tab))
+            except Exception as e:
+                print(f"Erro ao consultar a versão de '{self.tab}': {e}")
+                self._version = f"ttl-{int(time.time() // FALLBACK_TTL)}"
+            self.probes += 1
+            self.probe_seconds += time.perf_counter() - started
+            self._checked_at = now
+            return self._version
+
+    def expire(self):
+        """Força nova consulta na próxima chamada de `version`"""
+        with self._lock:
+            self._checked_at = None
+
+    def fetch(self, loader):
+        """Executa o download completo medindo o seu custo"""
+        started = time.perf_counter()
+        result = loader()
+        with self._lock:
+            self.fetches += 1
+            self.fetch_seconds += time.perf_counter() - started
+        return result
+
+    def report(self):
+        """Custo médio da consulta de versão contra o download completo"""
+        probe_avg = self.probe_seconds / self.probes if self.probes else 0.0
+        fetch_avg = self.fetch_seconds / self.fetches if self.fetches else 0.0
+        return {
+            "tab": self.tab,
+            "version": self._version,
+            "probes": self.probes,
+            "probe_avg_ms": probe_avg * 1000,
+            "fetches": self.fetches,
+            "fetch_avg_ms": fetch_avg * 1000,
+            "fetch_to_probe_ratio": fetch_avg / probe_avg if probe_avg else None,
+        }
+
+
+_gates = {}
+_gates_lock = threading.Lock()
+
+
+def get_version_gate(tab):
+    """Retorna o gate compartilhado da aba"""
+    with _gates_lock:
+        if tab not in _gates:
+            _gates[tab] = VersionGate(tab)
+        return _gates[tab]
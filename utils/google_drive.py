@@ -0,0 +1,38 @@
+import io
+
+from utils.config import DRIVE_FOLDER_ID
+from utils.connection import get_connection
+from utils.metrics import note_bytes
+from utils.scheduler import get_scheduler
+
+
+def upload_file_to_drive(file, filename, mimetype, folder_id=DRIVE_FOLDER_ID):
+    """Envia o arquivo para a pasta do Drive e retorna um link compartilhável"""
+    from googleapiclient.http import MediaIoBaseUpload
+
+    service = get_connection().drive_service
+
+    file_metadata = {'name': filename, 'parents': [folder_id]}
+    content = file.read()
+    note_bytes(len(content))
+    media = MediaIoBaseUpload(io.BytesIO(content), mimetype=mimetype)
+
+    # Repetir o upload após um 5xx/timeout pode criar o arquivo duas vezes
+    uploaded = get_scheduler().call(
+        service.files().create(body=file_metadata, media_body=media, fields='id').execute, kind="drive",
+        idempotent=False)
+
+    # Torna o arquivo compartilhável (repetir só reaplica a mesma permissão)
+    file_id = uploaded['id']
+    get_scheduler().call(
+        service.permissions().create(fileId=file_id, body={"role": "reader", "type": "anyone"}).execute,
+        kind="drive")
+    return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
+
+
+def get_file_version(file_id):
+    """Retorna o número de versão do arquivo no Drive (muda a cada edição)"""
+    service = get_connection().drive_service
+    request = service.files().get(fileId=file_id, fields='version,modifiedTime', supportsAllDrives=True)
+    meta = get_scheduler().call(request.execute, kind="drive")
+    return meta['version']
@@ -1,84 +1,709 @@
+import re
+import threading
+from collections import namedtuple
+
 import pandas as pd
 import gspread
-import streamlit as st
-from oauth2client.service_account import ServiceAccountCredentials
+from utils.connection import get_connection, spreadsheet_key
+from utils.google_drive import get_file_version
+from utils.snapshot import save_snapshot, snapshot_name
+
+# Edições interpretadas como se digitadas na planilha (números, datas e
+# porcentagens), como no `update_cell` do gspread
+USER_ENTERED = gspread.utils.ValueInputOption.user_entered
+
 
 def get_google_sheet_by_url(url):
     """Conecta ao Google Sheets usando a URL e retorna a planilha"""
-    scope = [
-        'https://www.googleapis.com/auth/spreadsheets',
-        'https://www.googleapis.com/auth/drive'
-    ]
-    
-    creds = ServiceAccountCredentials.from_json_keyfile_name(
-        'credentials/service_account.json', scope)
-    client = gspread.authorize(creds)
-    
     try:
-        sheet = client.open_by_url(url)
-        return sheet
+        return get_connection().open_spreadsheet(url)
     except Exception as e:
         print(f"Erro ao acessar a planilha: {e}")
         return None
 
 def get_worksheet(url, worksheet_name):
     """Obtém uma aba específica da planilha"""
-    sheet = get_google_sheet_by_url(url)
-    if sheet:
+    if get_google_sheet_by_url(url):
         try:
-            worksheet = sheet.worksheet(worksheet_name)
-            return worksheet
-        except:
+            return get_connection().open_worksheet(url, worksheet_name)
+        except gspread.exceptions.WorksheetNotFound:
             print(f"Aba '{worksheet_name}' não encontrada")
             return None
     return None
 
 
-def read_sheet_to_dataframe(spreadsheet_url, worksheet_name):
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds_dict = dict(st.secrets["google_sheets"])
-    creds = Credentials.from_service_account_info(creds_dict, scopes=scope)
-    gc = gspread.authorize(creds)
-    
-    spreadsheet = gc.open_by_url(spreadsheet_url)
-    worksheet = spreadsheet.worksheet(worksheet_name)
-    data = worksheet.get_all_records()
-    return pd.DataFrame(data)
+def _current_version(url):
+    try:
+        return get_file_version(spreadsheet_key(url))
+    except Exception:
+        return None
+
+
+def _save_snapshot(url, worksheet_name, df, version):
+    """Grava o snapshot local da aba; falhas nunca interrompem a leitura"""
+    try:
+        save_snapshot(snapshot_name(url, worksheet_name), df, version)
+    except Exception as e:
+        print(f"Erro ao gravar snapshot de '{worksheet_name}': {e}")
+
+
+def projected_ranges(header, columns, rows=None):
+    """
+    Converte nomes de colunas (e uma faixa de linhas opcional) em intervalos A1.
+
+    Colunas vizinhas na planilha viram um único intervalo. Retorna a lista de
+    (intervalo, [colunas do intervalo]).
+
+    :param rows: (start, stop) linhas de dados em base 0, sem o cabeçalho;
+                 None lê até o fim da aba
+    """
+    positions = {}
+    for name in columns:
+        if name not in header:
+            raise KeyError(f"Coluna '{name}' não existe na aba")
+        positions[header.index(name) + 1] = name
+
+    first = rows[0] + 2 if rows else 2
+    last = str(rows[1] + 1) if rows else ""
+
+    runs, run = [], []
+    for col in sorted(positions):
+        if run and col != run[-1] + 1:
+            runs.append(run)
+            run = []
+        run.append(col)
+    if run:
+        runs.append(run)
+    return [(f"{column_letter(run[0])}{first}:{column_letter(run[-1])}{last}",
+             [positions[c] for c in run]) for run in runs]
+
+
+def read_sheet_to_dataframe(spreadsheet_url, worksheet_name, columns=None, rows=None, dtypes=None):
+    """
+    Lê uma aba da planilha para um DataFrame.
+
+    Sem `columns`/`rows`, lê a aba inteira (`get_all_records`) e grava um
+    snapshot local com a versão da planilha (`utils.snapshot`). Com eles, lê
+    apenas as colunas pedidas (e a faixa de linhas) em um único `batch_get`,
+    resolvendo os intervalos pelo cabeçalho em cache, conferido com a linha 1
+    lida no mesmo `batch_get`. Nesse modo os valores vêm como texto formatado
+    e linhas finais vazias em todas as colunas pedidas são omitidas.
+
+    :param columns: lista de colunas a ler (na ordem do DataFrame retornado)
+    :param rows: (start, stop) linhas de dados em base 0; o índice do
+                 DataFrame começa em `start`
+    :param dtypes: dict {coluna: dtype} aplicado ao resultado
+    """
+    worksheet = get_connection().open_worksheet(spreadsheet_url, worksheet_name)
+    if columns is None and rows is None:
+        # Versão lida antes do download: se algo mudar durante a leitura, a
+        # próxima consulta de versão já enxerga a diferença
+        version = _current_version(spreadsheet_url)
+        df = pd.DataFrame(worksheet.get_all_records())
+        df = df.astype(dtypes) if dtypes else df
+        _save_snapshot(spreadsheet_url, worksheet_name, df, version)
+        return df
+
+    header = get_header(spreadsheet_url, worksheet_name)
+    wanted = list(columns) if columns is not None else None
+    if rows and rows[1] <= rows[0]:
+        return pd.DataFrame(columns=wanted if wanted is not None else [c for c in header if c])
+    # A linha 1 vem no mesmo batch_get: se o cabeçalho em cache estiver
+    # desatualizado (colunas inseridas ou movidas), resolve de novo e relê
+    for _ in range(2):
+        columns = wanted if wanted is not None else [c for c in header if c]
+        ranges = projected_ranges(header, columns, rows)
+        results = worksheet.batch_get([rng for rng, _ in ranges] + ["1:1"])
+        current = results.pop()
+        current = current[0] if current else []
+        if _same_header(current, header):
+            break
+        header = _header_cache[(spreadsheet_key(spreadsheet_url), worksheet_name)] = current
+
+    n_rows = max((len(values) for values in results), default=0)
+    if rows:
+        n_rows = min(n_rows, rows[1] - rows[0])
+    data = {}
+    for (_, names), values in zip(ranges, results):
+        values = list(values)[:n_rows]
+        values += [[]] * (n_rows - len(values))
+        for pos, name in enumerate(names):
+            data[name] = [line[pos] if pos < len(line) else "" for line in values]
+
+    start = rows[0] if rows else 0
+    df = pd.DataFrame(data, columns=columns, index=range(start, start + n_rows))
+    return df.astype(dtypes) if dtypes else df
+
+
+# Linhas por janela na leitura em blocos
+CHUNK_ROWS = 5_000
+
+# Textos que o `numericise` do gspread pode converter em número (superconjunto)
+_NUMERIC_CANDIDATE = re.compile(r"[\s,]*[-+.\dinIN]")
+
+
+def numericise_values(values):
+    """Mesmo resultado do `numericise_all` do gspread, sem tentar converter textos comuns"""
+    numericise = gspread.utils.numericise
+    return [numericise(v) if isinstance(v, str) and _NUMERIC_CANDIDATE.match(v) else v for v in values]
+
+
+def iter_sheet_chunks(spreadsheet_url, worksheet_name, chunk_rows=CHUNK_ROWS, columns=None, dtypes=None):
+    """
+    Lê a aba em janelas de `chunk_rows` linhas, gerando um DataFrame por janela.
+
+    Só uma janela fica em memória por vez, então agregações e exportações
+    podem percorrer a aba inteira sem montá-la. Os números são convertidos
+    como no `get_all_records`; o índice segue a posição da linha de dados na
+    aba (base 0).
+
+    A API omite as linhas vazias do fim de cada intervalo, então uma janela
+    incompleta não marca o fim da aba: a leitura vai até o número de linhas
+    da grade (`row_count`) e só para antes disso se a janela vier cheia até
+    o fim da grade conhecida (grade em cache desatualizada por appends).
+    """
+    worksheet = get_connection().open_worksheet(spreadsheet_url, worksheet_name)
+    total = worksheet.row_count - 1  # sem o cabeçalho
+    start = 0
+    while True:
+        chunk = read_sheet_to_dataframe(spreadsheet_url, worksheet_name, columns=columns,
+                                        rows=(start, start + chunk_rows))
+        if chunk is None:
+            return
+        if not chunk.empty:
+            for col in chunk.columns:
+                chunk[col] = numericise_values(chunk[col].tolist())
+            yield chunk.astype(dtypes) if dtypes else chunk
+        start += chunk_rows
+        if start >= total and len(chunk) < chunk_rows:
+            return
+
+
+# Limite de células por requisição no modo em lote (divide frames muito grandes)
+BATCH_MAX_CELLS = 100_000
+
+# Cabeçalhos por (ID da planilha, aba)
+_header_cache = {}
+
 
+def dataframe_to_values(dataframe):
+    """Converte o DataFrame em lista de linhas serializáveis (sem iterrows)"""
+    df = dataframe.copy()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+    df = df.astype(object).where(df.notna(), "")
+    return df.to_numpy().tolist()
+
+
+def write_dataframe_to_sheet(url, worksheet_name, dataframe, mode="batch", max_cells=BATCH_MAX_CELLS,
+                             key_column="key"):
+    """
+    Escreve um DataFrame em uma planilha.
+
+    :param mode: 'batch' envia cabeçalho e valores em uma (ou poucas) atualizações
+                 de intervalo; 'sync' envia apenas as diferenças em relação à
+                 planilha (ver `sync_dataframe_to_sheet`) e retorna um SyncReport;
+                 'rows' mantém o comportamento antigo (um append por linha)
+    :param max_cells: número máximo de células por atualização no modo 'batch'
+    :param key_column: coluna que identifica cada linha no modo 'sync'
+    """
+    if mode == "sync":
+        return sync_dataframe_to_sheet(url, worksheet_name, dataframe, key_column=key_column)
 
-def write_dataframe_to_sheet(url, worksheet_name, dataframe):
-    """Escreve um DataFrame em uma planilha"""
     worksheet = get_worksheet(url, worksheet_name)
-    if worksheet:
+    if not worksheet:
+        return False
+
+    headers = dataframe.columns.tolist()
+
+    if mode == "rows":
         # Limpa a planilha existente
         worksheet.clear()
-        
+
         # Adiciona cabeçalhos
-        headers = dataframe.columns.tolist()
         worksheet.append_row(headers)
-        
+
         # Adiciona dados
         for _, row in dataframe.iterrows():
             worksheet.append_row(row.tolist())
         return True
-    return False
+
+    values = [headers] + dataframe_to_values(dataframe)
+    n_rows, n_cols = len(values), max(len(headers), 1)
+
+    worksheet.clear()
+    # Garante que a grade comporta o frame inteiro antes de escrever por intervalo
+    if worksheet.row_count < n_rows or worksheet.col_count < n_cols:
+        worksheet.resize(rows=max(worksheet.row_count, n_rows),
+                         cols=max(worksheet.col_count, n_cols))
+
+    chunk_rows = max(1, max_cells // n_cols)
+    for start in range(0, n_rows, chunk_rows):
+        chunk = values[start:start + chunk_rows]
+        worksheet.update(chunk, gspread.utils.rowcol_to_a1(start + 1, 1))
+    _header_cache[(spreadsheet_key(url), worksheet_name)] = [str(h) for h in headers]
+    invalidate_sheet_index(url, worksheet_name)
+    return True
+
+SyncReport = namedtuple("SyncReport", ["cells_written", "cells_updated", "rows_appended", "rows_deleted"])
+
+
+def _cell_text(value):
+    """Representação textual usada para comparar valores com a planilha"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def diff_sheet_values(current, dataframe, key_column="key", write_header=False):
+    """
+    Compara o estado atual da aba (lista de linhas, com cabeçalho) com o DataFrame.
+
+    As colunas são casadas pelo nome no cabeçalho da aba, não pela posição no
+    DataFrame; colunas da aba ausentes do DataFrame ficam intactas. Retorna
+    (células alteradas, linhas novas, linhas removidas, cabeçalho), onde as
+    células são tuplas (linha, coluna, valor) em coordenadas da planilha
+    (base 1), as linhas novas são listas na ordem das colunas da aba, as
+    removidas são os números das linhas na planilha e o cabeçalho é o da aba
+    após a sincronização.
+
+    A linha 1 só é escrita se a aba não tem cabeçalho ou com
+    `write_header=True`, que acrescenta ao fim do cabeçalho as colunas do
+    DataFrame que a aba não tem. Sem isso, coluna ausente na aba é erro.
+    """
+    headers = [str(c) for c in dataframe.columns]
+    if key_column not in headers:
+        raise ValueError(f"Coluna chave '{key_column}' não existe no DataFrame")
+
+    sheet_header = [str(c) for c in current[0]] if current else []
+    changed = []
+    if not any(sheet_header):
+        sheet_header = []
+    missing = [name for name in headers if name not in sheet_header]
+    if missing and sheet_header and not write_header:
+        raise ValueError(f"Colunas ausentes no cabeçalho da aba: {', '.join(missing)}")
+    for name in missing:
+        sheet_header.append(name)
+        changed.append((1, len(sheet_header), name))
+    positions = [sheet_header.index(name) for name in headers]
+    key_pos = sheet_header.index(key_column)
+
+    outgoing = dataframe_to_values(dataframe)
+    outgoing_keys = [_cell_text(r[headers.index(key_column)]) for r in outgoing]
+    if len(set(outgoing_keys)) != len(outgoing_keys):
+        raise ValueError(f"Valores duplicados na coluna chave '{key_column}'")
+
+    existing = {}
+    for row_number, line in enumerate(current[1:], start=2):
+        key = line[key_pos] if len(line) > key_pos else ""
+        if key != "":
+            existing[key] = (row_number, line)
+
+    appended = []
+    for key, values in zip(outgoing_keys, outgoing):
+        if key not in existing:
+            row = [""] * len(sheet_header)
+            for pos, value in zip(positions, values):
+                row[pos] = value
+            appended.append(row)
+            continue
+        row_number, line = existing.pop(key)
+        for pos, value in zip(positions, values):
+            old = line[pos] if pos < len(line) else ""
+            if _cell_text(value) != old:
+                changed.append((row_number, pos + 1, value))
+
+    deleted = sorted(row_number for row_number, _ in existing.values())
+    return changed, appended, deleted, sheet_header
+
+
+def sync_dataframe_to_sheet(url, worksheet_name, dataframe, key_column="key", previous=None, write_header=False):
+    """
+    Sincroniza o DataFrame com a aba enviando só o que mudou.
+
+    Linhas são casadas pela coluna `key_column` e colunas pelo nome no
+    cabeçalho da aba (ver `diff_sheet_values`). Os valores vão como
+    USER_ENTERED, como nas escritas por chave: células alteradas em um
+    `values.batchUpdate`, linhas removidas em um `batch_update` e linhas
+    novas em um append, sem limpar a aba (outras sessões nunca a veem vazia).
+
+    :param previous: último estado conhecido da aba (DataFrame na mesma ordem
+                     das linhas da planilha); se omitido, a aba é lida uma vez
+    :param write_header: acrescenta ao cabeçalho as colunas que a aba não tem
+    :return: SyncReport com o número de células escritas, ou None se a aba não existir
+    """
+    worksheet = get_worksheet(url, worksheet_name)
+    if not worksheet:
+        return None
+
+    if previous is None:
+        current = worksheet.get_all_values()
+    else:
+        current = [[str(c) for c in previous.columns]]
+        current += [[_cell_text(v) for v in line] for line in dataframe_to_values(previous)]
+
+    changed, appended, deleted, header = diff_sheet_values(current, dataframe, key_column, write_header)
+
+    if changed:
+        worksheet.batch_update([{"range": gspread.utils.rowcol_to_a1(row, col), "values": [[plain_value(value)]]}
+                                for row, col, value in changed], value_input_option=USER_ENTERED)
+    if deleted:
+        # Remove de baixo para cima para não deslocar os índices seguintes
+        worksheet.spreadsheet.batch_update({"requests": [{"deleteDimension": {"range": {
+            "sheetId": worksheet.id, "dimension": "ROWS",
+            "startIndex": row - 1, "endIndex": row,
+        }}} for row in reversed(deleted)]})
+    if appended:
+        worksheet.append_rows([[plain_value(v) for v in line] for line in appended],
+                              value_input_option=USER_ENTERED, table_range="A1")
+    _header_cache[(spreadsheet_key(url), worksheet_name)] = header
+    if appended or deleted:
+        invalidate_sheet_index(url, worksheet_name)
+
+    cells_appended = sum(len(line) for line in appended)
+    return SyncReport(
+        cells_written=len(changed) + cells_appended,
+        cells_updated=len(changed),
+        rows_appended=len(appended),
+        rows_deleted=len(deleted),
+    )
+
+def append_rows_to_sheet(url, worksheet_name, rows):
+    """Adiciona novas linhas à planilha (e ao índice da aba, se houver)"""
+    worksheet = get_worksheet(url, worksheet_name)
+    if not worksheet:
+        return False
+
+    response = worksheet.append_rows([[plain_value(v) for v in row] for row in rows])
+    first_row = _appended_row_number(response)
+    sheet = spreadsheet_key(url)
+    with _indexes_lock:
+        indexes = [idx for k, idx in _indexes.items() if k[:2] == (sheet, worksheet_name)]
+    for index in indexes:
+        if first_row is None:
+            index.refresh()
+            continue
+        for offset, row in enumerate(rows):
+            index.register(index.key_of(row), first_row + offset)
+    return True
 
 def append_row_to_sheet(url, worksheet_name, row_data):
     """Adiciona uma nova linha à planilha"""
+    return append_rows_to_sheet(url, worksheet_name, [row_data])
+
+def plain_value(value):
+    """Converte escalares numpy/pandas em tipos Python serializáveis"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _same_header(a, b):
+    """Compara cabeçalhos ignorando células vazias no fim (a API as omite)"""
+    a, b = list(a), list(b)
+    while a and a[-1] == "":
+        a.pop()
+    while b and b[-1] == "":
+        b.pop()
+    return a == b
+
+
+def get_header(url, worksheet_name, refresh=False):
+    """Retorna o cabeçalho (linha 1) da aba, mantido em cache por aba"""
+    key = (spreadsheet_key(url), worksheet_name)
+    if refresh or key not in _header_cache:
+        worksheet = get_worksheet(url, worksheet_name)
+        if not worksheet:
+            return None
+        _header_cache[key] = worksheet.row_values(1)
+    return _header_cache[key]
+
+
+def _row_ranges(row_index, new_values, header):
+    """Converte os novos valores de uma linha em intervalos A1 contíguos"""
+    if not isinstance(new_values, dict):
+        values = [plain_value(v) for v in new_values]
+        return [{"range": gspread.utils.rowcol_to_a1(row_index, 1), "values": [values]}]
+
+    cols = {}
+    for name, value in new_values.items():
+        if name not in header:
+            raise KeyError(name)
+        cols[header.index(name) + 1] = plain_value(value)
+
+    # Agrupa colunas consecutivas em um mesmo intervalo
+    ranges, run = [], []
+    for col in sorted(cols):
+        if run and col != run[-1] + 1:
+            ranges.append(run)
+            run = []
+        run.append(col)
+    if run:
+        ranges.append(run)
+    return [{"range": gspread.utils.rowcol_to_a1(row_index, run[0]),
+             "values": [[cols[c] for c in run]]} for run in ranges]
+
+
+def update_rows_in_sheet(url, worksheet_name, updates):
+    """
+    Atualiza várias linhas em uma única requisição (values.batchUpdate).
+
+    :param updates: dict {número da linha na planilha: novos valores}, onde os
+                    valores são uma lista posicional (a partir da coluna A) ou
+                    um dict {nome da coluna: valor}
+    """
     worksheet = get_worksheet(url, worksheet_name)
-    if worksheet:
-        worksheet.append_row(row_data)
-        return True
-    return False
+    if not worksheet:
+        return False
+
+    header = None
+    if any(isinstance(v, dict) for v in updates.values()):
+        header = get_header(url, worksheet_name)
+
+    data = []
+    for row_index, new_values in updates.items():
+        try:
+            data += _row_ranges(row_index, new_values, header)
+        except KeyError as e:
+            print(f"Coluna {e} não encontrada na aba '{worksheet_name}'")
+            return False
+
+    if data:
+        worksheet.batch_update(data, value_input_option=USER_ENTERED)
+    return True
 
 def update_row_in_sheet(url, worksheet_name, row_index, new_values):
-    """Atualiza uma linha específica na planilha"""
-    worksheet = get_worksheet(url, worksheet_name)
-    if worksheet:
-        for col, value in enumerate(new_values, start=1):
-            worksheet.update_cell(row_index, col, value)
+    """
+    Atualiza uma linha específica na planilha em uma única requisição.
+
+    :param new_values: lista posicional (a partir da coluna A) ou
+                       dict {nome da coluna: valor}
+    """
+    return update_rows_in_sheet(url, worksheet_name, {row_index: new_values})
+
+def column_letter(col):
+    """Converte o número da coluna (base 1) na letra A1 correspondente"""
+    return gspread.utils.rowcol_to_a1(1, col)[:-1]
+
+
+def _appended_row_number(response):
+    """Extrai o número da linha inserida da resposta de um append"""
+    try:
+        updated_range = response["updates"]["updatedRange"]
+    except (TypeError, KeyError):
+        return None
+    row, _ = gspread.utils.a1_to_rowcol(updated_range.split("!")[-1].split(":")[0])
+    return row
+
+
+class SheetIndex:
+    """
+    Índice chave → número da linha e coluna → letra de uma aba.
+
+    Busca apenas o cabeçalho e a coluna chave (nunca a aba inteira) e é
+    atualizado de forma incremental a cada append feito pelo app. Antes de
+    cada escrita, `resolve` confere a chave nas linhas de destino, porque
+    linhas inseridas ou removidas fora do app deslocam o índice.
+    """
+
+    def __init__(self, url, worksheet_name, key_column="key"):
+        self.url = url
+        self.worksheet_name = worksheet_name
+        self.key_column = key_column
+        self.rows = {}
+        self.columns = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    def refresh(self):
+        """Relê o cabeçalho e a coluna chave da aba"""
+        worksheet = get_worksheet(self.url, self.worksheet_name)
+        if not worksheet:
+            return False
+        header = get_header(self.url, self.worksheet_name, refresh=True)
+        if self.key_column not in header:
+            print(f"Coluna chave '{self.key_column}' não encontrada na aba '{self.worksheet_name}'")
+            return False
+
+        keys = worksheet.col_values(header.index(self.key_column) + 1)
+        with self._lock:
+            self.columns = {name: column_letter(col) for col, name in enumerate(header, start=1) if name}
+            self.rows = {str(key): row for row, key in enumerate(keys[1:], start=2) if key != ""}
+            self._loaded = True
         return True
-    return False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    def row_of(self, key):
+        """Número da linha na planilha para a chave (ou None)"""
+        with self._lock:
+            self._ensure_loaded()
+            return self.rows.get(str(key))
+
+    def column_of(self, name):
+        """Letra da coluna para o nome do cabeçalho (ou None)"""
+        with self._lock:
+            self._ensure_loaded()
+            return self.columns.get(name)
+
+    def register(self, key, row):
+        """Registra uma linha recém-inserida (atualização incremental)"""
+        with self._lock:
+            if self._loaded and key not in (None, ""):
+                self.rows[str(key)] = row
+
+    def key_of(self, values):
+        """Extrai a chave de uma linha posicional ou dict"""
+        if isinstance(values, dict):
+            return values.get(self.key_column)
+        with self._lock:
+            letter = self.columns.get(self.key_column)
+        if letter is None:
+            return None
+        pos = gspread.utils.column_letter_to_index(letter) - 1
+        return values[pos] if pos < len(values) else None
+
+    def _lookup(self, key, column):
+        """Endereço A1 da célula (chave, coluna) pelo índice atual, sem reler (ou None)"""
+        row, letter = self.row_of(key), self.column_of(column)
+        if row is None or letter is None:
+            return None
+        return f"{letter}{row}"
+
+    def locate(self, key, column):
+        """Retorna o endereço A1 da célula (chave, coluna), relendo o índice uma vez se preciso"""
+        address = self._lookup(key, column)
+        if address is None:
+            self.refresh()
+            address = self._lookup(key, column)
+        return address
+
+    def _mismatched(self, worksheet, rows):
+        """Linhas de `rows` ({linha: chave esperada}) cuja chave na planilha é outra"""
+        with self._lock:
+            letter = self.columns.get(self.key_column)
+        first, last = min(rows), max(rows)
+        values = worksheet.batch_get([f"{letter}{first}:{letter}{last}"])[0]
+        found = {}
+        for offset, line in enumerate(values):
+            found[first + offset] = str(line[0]) if line else ""
+        return {row for row, key in rows.items() if found.get(row, "") != key}
+
+    def _check(self, worksheet, cells, addresses):
+        """Linhas dos endereços cuja chave na planilha não confere (uma requisição)"""
+        rows = {}
+        for (key, _), address in zip(cells, addresses):
+            if address is not None:
+                rows[gspread.utils.a1_to_rowcol(address)[0]] = str(key)
+        return self._mismatched(worksheet, rows) if rows else set()
+
+    def resolve(self, worksheet, cells):
+        """
+        Endereços A1 de várias células (chave, coluna), conferidos na planilha.
+
+        Procura todas as células no índice e lê a coluna chave das linhas de
+        destino em uma única requisição. O índice é relido no máximo uma vez
+        por chamada: se alguma célula não está no índice ou alguma linha não
+        tem mais a chave esperada. Células não encontradas ou ainda
+        divergentes ficam como None.
+        """
+        addresses = [self._lookup(key, column) for key, column in cells]
+        refreshed = None in addresses
+        if refreshed:
+            self.refresh()
+            addresses = [self._lookup(key, column) for key, column in cells]
+        mismatched = self._check(worksheet, cells, addresses)
+        if mismatched and not refreshed:
+            print(f"Índice de '{self.worksheet_name}' desatualizado (linhas movidas fora do app); relendo")
+            self.refresh()
+            addresses = [self._lookup(key, column) for key, column in cells]
+            mismatched = self._check(worksheet, cells, addresses)
+        return [None if address is None or gspread.utils.a1_to_rowcol(address)[0] in mismatched else address
+                for address in addresses]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_sheet_index(url, worksheet_name, key_column="key"):
+    """Retorna o índice compartilhado da aba (criado sob demanda)"""
+    key = (spreadsheet_key(url), worksheet_name, key_column)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = SheetIndex(url, worksheet_name, key_column)
+        return _indexes[key]
+
+
+def invalidate_sheet_index(url, worksheet_name):
+    """Descarta os índices da aba (ex.: após reescrever ou remover linhas)"""
+    sheet = spreadsheet_key(url)
+    with _indexes_lock:
+        for key in [k for k in _indexes if k[:2] == (sheet, worksheet_name)]:
+            del _indexes[key]
+
+
+def update_cell_by_key(url, worksheet_name, row_identifier, column, new_value, key_column="key"):
+    """
+    Atualiza a coluna `column` da linha identificada por `row_identifier`
+    usando o índice da aba (busca O(1) e uma única chamada de escrita).
+    """
+    worksheet = get_worksheet(url, worksheet_name)
+    if not worksheet:
+        print("Erro ao acessar a planilha.")
+        return False
+
+    cell, = get_sheet_index(url, worksheet_name, key_column).resolve(worksheet, [(row_identifier, column)])
+    if cell is None:
+        print("Identificador ou coluna não encontrado.")
+        return False
+    worksheet.update([[plain_value(new_value)]], cell, value_input_option=USER_ENTERED)
+    return True
+
+
+def update_cells_by_key(url, worksheet_name, updates, key_column="key"):
+    """
+    Atualiza várias células (chave, coluna, valor) em um único batch_update.
+
+    Células cuja chave ou coluna não existe são ignoradas.
+    Retorna a lista de (chave, coluna) escritas (None se a aba não existir).
+    """
+    worksheet = get_worksheet(url, worksheet_name)
+    if not worksheet:
+        return None
+
+    updates = list(updates)
+    cells = get_sheet_index(url, worksheet_name, key_column).resolve(
+        worksheet, [(row_identifier, column) for row_identifier, column, _ in updates])
+    data, written = [], []
+    for (row_identifier, column, value), cell in zip(updates, cells):
+        if cell is None:
+            print(f"Célula ignorada: '{row_identifier}'/'{column}' não encontrado em '{worksheet_name}'")
+            continue
+        data.append({"range": cell, "values": [[plain_value(value)]]})
+        written.append((row_identifier, column))
+
+    if data:
+        worksheet.batch_update(data, value_input_option=USER_ENTERED)
+    return written
+
+
+def update_row_by_key(url, worksheet_name, row_identifier, new_values, key_column="key"):
+    """Atualiza várias colunas ({nome: valor}) da linha identificada pela chave"""
+    worksheet = get_worksheet(url, worksheet_name)
+    if not worksheet:
+        return False
+    cell, = get_sheet_index(url, worksheet_name, key_column).resolve(worksheet, [(row_identifier, key_column)])
+    if cell is None:
+        print("Identificador não encontrado.")
+        return False
+    return update_row_in_sheet(url, worksheet_name, gspread.utils.a1_to_rowcol(cell)[0], new_values)
+
 
 def update_1st_aval_column(url, worksheet_name, row_identifier, new_value):
     """
@@ -87,22 +712,7 @@ def update_1st_aval_column(url, worksheet_name, row_identifier, new_value):
     
     :param url: URL da planilha Google Sheets
     :param worksheet_name: Nome da aba da planilha
-    :param row_identifier: Identificador único (ex: 'Descrição Meta', 'ID', etc.)
+    :param row_identifier: Valor da coluna 'key' da linha
     :param new_value: Novo valor para a coluna '1º Avaliação'
     """
-    worksheet = get_worksheet(url, worksheet_name)
-    if worksheet:
-        # Encontra todas as linhas da planilha
-        rows = worksheet.get_all_records()
-        
-        for i, row in enumerate(rows, start=2):  # Começando da linha 2 (a 1 é de cabeçalho)
-            if row['key'] == row_identifier:  # Supondo que 'Descrição Meta' seja única
-                # Atualiza o valor da célula '1º Avaliação' na linha encontrada
-                worksheet.update_cell(i, rows[0].keys().index('1º Avaliação') + 1, new_value)
-                print(f"Coluna '1º Avaliação' atualizada para: {new_value} na linha {i}")
-                return True  # Retorna True se a atualização foi bem-sucedida
-        print("Identificador não encontrado.")
-        return False  # Retorna False se não encontrar o identificador
-    else:
-        print("Erro ao acessar a planilha.")
-        return False
+    return update_cell_by_key(url, worksheet_name, row_identifier, '1º Avaliação', new_value)
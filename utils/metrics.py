@@ -0,0 +1,269 @@
+"""
+Instrumentação das chamadas de armazenamento e das requisições às APIs.
+
+Cada operação do backend (`track`) gera um `CallRecord` com operação, aba,
+linhas e células tocadas, bytes trafegados, latência e retentativas. As
+requisições HTTP (Sheets/Drive) contam bytes e retentativas na operação em
+andamento da mesma thread e também são agregadas por tipo de cota.
+
+Os totais saem no formato texto do Prometheus (`prometheus_text`), em
+arquivo (`PPR_METRICS_FILE`) e/ou em um endpoint local
+(`PPR_METRICS_PORT`, caminho /metrics). As chamadas recentes ficam em
+memória, marcadas com a sessão do Streamlit, para o painel de depuração.
+"""
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.config import METRICS_FILE, METRICS_INTERVAL, METRICS_PORT
+
+# Limites dos histogramas de latência (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Chamadas mantidas para o painel de depuração
+RECENT_CALLS = 2000
+
+CallRecord = namedtuple("CallRecord", ["op", "tab", "backend", "rows", "cells", "bytes", "latency",
+                                       "retries", "error", "session", "started"])
+
+
+def session_id():
+    """ID da sessão do Streamlit da thread atual (None fora de uma sessão)"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+class _Series:
+    """Contadores e histograma de latência de uma combinação de rótulos"""
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.cells = 0
+        self.bytes = 0
+        self.retries = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * len(buckets)
+
+    def observe(self, latency, bucket_limits):
+        self.calls += 1
+        self.latency_sum += latency
+        for i, limit in enumerate(bucket_limits):
+            if latency <= limit:
+                self.buckets[i] += 1
+
+
+class Metrics:
+    """Registro thread-safe das chamadas de armazenamento e de API"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, keep=RECENT_CALLS):
+        self.bucket_limits = tuple(buckets)
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=keep)
+        self._storage = {}
+        self._api = {}
+
+    def _series(self, table, labels):
+        series = table.get(labels)
+        if series is None:
+            series = table[labels] = _Series(self.bucket_limits)
+        return series
+
+    def record(self, call):
+        """Registra uma operação de armazenamento concluída"""
+        with self._lock:
+            self._recent.append(call)
+            series = self._series(self._storage, (call.op, call.tab or "", call.backend or ""))
+            series.observe(call.latency, self.bucket_limits)
+            series.errors += call.error is not None
+            series.rows += call.rows
+            series.cells += call.cells
+            series.bytes += call.bytes
+            series.retries += call.retries
+
+    def record_api(self, kind, latency, retries, error=None):
+        """Registra uma requisição às APIs (já com as retentativas)"""
+        with self._lock:
+            series = self._series(self._api, (kind,))
+            series.observe(latency, self.bucket_limits)
+            series.errors += error is not None
+            series.retries += retries
+
+    def recent(self, session=None, since=None):
+        """Chamadas recentes (opcionalmente de uma sessão e a partir de um instante)"""
+        with self._lock:
+            calls = list(self._recent)
+        return [c for c in calls
+                if (session is None or c.session == session) and (since is None or c.started >= since)]
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._storage.clear()
+            self._api.clear()
+
+    def prometheus_text(self):
+        """Contadores e histogramas no formato texto do Prometheus"""
+        with self._lock:
+            storage = sorted(self._storage.items())
+            api = sorted(self._api.items())
+        lines = []
+
+        def counter(name, help_text, table, attr, label_names):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, series in table:
+                lines.append(f"{name}{{{_labels(label_names, labels)}}} {getattr(series, attr)}")
+
+        def histogram(name, help_text, table, label_names):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, series in table:
+                base = _labels(label_names, labels)
+                for limit, count in zip(self.bucket_limits, series.buckets):
+                    lines.append(f'{name}_bucket{{{base},le="{limit}"}} {count}')
+                lines.append(f'{name}_bucket{{{base},le="+Inf"}} {series.calls}')
+                lines.append(f"{name}_sum{{{base}}} {series.latency_sum:.6f}")
+                lines.append(f"{name}_count{{{base}}} {series.calls}")
+
+        names = ("op", "tab", "backend")
+        counter("ppr_storage_calls_total", "Operações de armazenamento.", storage, "calls", names)
+        counter("ppr_storage_errors_total", "Operações de armazenamento com erro.", storage, "errors", names)
+        counter("ppr_storage_rows_total", "Linhas lidas ou escritas.", storage, "rows", names)
+        counter("ppr_storage_cells_total", "Células lidas ou escritas.", storage, "cells", names)
+        counter("ppr_storage_bytes_total", "Bytes trafegados nas APIs.", storage, "bytes", names)
+        counter("ppr_storage_retries_total", "Retentativas (429/5xx) nas operações.", storage, "retries", names)
+        histogram("ppr_storage_latency_seconds", "Latência das operações de armazenamento.", storage, names)
+
+        counter("ppr_api_requests_total", "Requisições às APIs do Sheets/Drive.", api, "calls", ("kind",))
+        counter("ppr_api_errors_total", "Requisições que falharam após as retentativas.", api, "errors", ("kind",))
+        counter("ppr_api_retries_total", "Retentativas das requisições.", api, "retries", ("kind",))
+        histogram("ppr_api_latency_seconds", "Latência das requisições (com retentativas).", api, ("kind",))
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names, values):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{n}="{escape(v)}"' for n, v in zip(names, values))
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Retorna o registro compartilhado do processo"""
+    return _metrics
+
+
+# --- Operação em andamento na thread ---
+_active = threading.local()
+
+
+@contextmanager
+def track(op, tab=None, backend=None):
+    """
+    Mede uma operação de armazenamento.
+
+    Entrega um dict em que o chamador preenche `rows` e `cells`; bytes e
+    retentativas das requisições feitas dentro do bloco são somados sozinhos.
+    """
+    call = {"rows": 0, "cells": 0, "bytes": 0, "retries": 0}
+    stack = getattr(_active, "stack", None)
+    if stack is None:
+        stack = _active.stack = []
+    stack.append(call)
+    started = time.time()
+    timer = time.perf_counter()
+    error = None
+    try:
+        yield call
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        stack.pop()
+        _metrics.record(CallRecord(op, tab, backend, call["rows"], call["cells"], call["bytes"],
+                                   time.perf_counter() - timer, call["retries"], error, session_id(), started))
+
+
+def _current():
+    stack = getattr(_active, "stack", None)
+    return stack[-1] if stack else None
+
+
+def note_retry():
+    """Conta uma retentativa na operação em andamento"""
+    call = _current()
+    if call is not None:
+        call["retries"] += 1
+
+
+def note_bytes(nbytes):
+    """Soma bytes trafegados à operação em andamento"""
+    call = _current()
+    if call is not None:
+        call["bytes"] += nbytes
+
+
+# --- Exportação ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = _metrics.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_prometheus(path):
+    """Grava o texto do Prometheus de forma atômica (ex.: para o textfile collector)"""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(_metrics.prometheus_text())
+    os.replace(tmp, path)
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_exporters(metrics_file=METRICS_FILE, port=METRICS_PORT, interval=METRICS_INTERVAL):
+    """Inicia (uma vez por processo) a gravação periódica do arquivo e o endpoint /metrics"""
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    if metrics_file:
+        def write_loop():
+            while True:
+                try:
+                    write_prometheus(metrics_file)
+                except OSError as e:
+                    print(f"Erro ao gravar métricas: {e}")
+                time.sleep(interval)
+        threading.Thread(target=write_loop, name="metrics-file", daemon=True).start()
+
+    if port:
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+        except OSError as e:
+            print(f"Erro ao abrir o endpoint de métricas na porta {port}: {e}")
+            return
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
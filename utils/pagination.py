@@ -0,0 +1,39 @@
+"""
+Estado persistente dos controles de ordenação e paginação dos resultados.
+
+O Streamlit descarta o estado de um widget quando ele não é desenhado numa
+execução (por exemplo, ao abrir uma página de Entrega). Cada controle guarda
+uma cópia em `_<chave>` e é restaurado a partir dela, então a ordenação e a
+página continuam as mesmas na volta ao painel.
+"""
+import math
+
+import streamlit as st
+
+PAGE_SIZES = [10, 20, 50, 100]
+
+
+def restore(key, default):
+    """Prepara o estado do widget `key` antes de desenhá-lo (cópia salva ou padrão)"""
+    if key not in st.session_state:
+        st.session_state[key] = st.session_state.get(f"_{key}", default)
+    return st.session_state[key]
+
+
+def remember(key):
+    """Salva o valor atual do widget `key` para as próximas execuções"""
+    st.session_state[f"_{key}"] = st.session_state[key]
+    return st.session_state[key]
+
+
+def page_sizes(default):
+    """Tamanhos oferecidos, incluindo o padrão configurado"""
+    return sorted(set(PAGE_SIZES) | {default})
+
+
+def page_bounds(total, page, size):
+    """(página válida, total de páginas, início, fim) das linhas de uma página"""
+    pages = max(1, math.ceil(total / size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * size
+    return page, pages, start, min(start + size, total)
@@ -0,0 +1,45 @@
+"""
+DataFrame compartilhado com índice de partição por coluna.
+
+`PartitionedFrame` guarda o Cronograma completo (normalizado) uma única vez
+por versão, junto com o índice E-mail → posições das linhas. A visão de
+cada usuário é uma consulta ao dicionário mais um `take`, sem varrer o
+DataFrame. Como o índice é construído junto com o DataFrame, uma nova
+versão da planilha sempre traz um índice novo e consistente.
+"""
+import numpy as np
+
+_NO_ROWS = np.array([], dtype=np.intp)
+
+
+def normalize_key(value):
+    """Chave de partição: texto sem espaços nas pontas e em minúsculas"""
+    return "" if value is None else str(value).strip().lower()
+
+
+class PartitionedFrame:
+    """DataFrame imutável + índice {chave normalizada: posições das linhas}"""
+
+    def __init__(self, frame, column="E-mail"):
+        self.frame = frame
+        self.column = column
+        self.index = {}
+        if frame is not None and column in frame.columns and len(frame):
+            keys = frame[column].map(normalize_key)
+            self.index = keys.groupby(keys, observed=True, sort=False).indices
+
+    def __len__(self):
+        return 0 if self.frame is None else len(self.frame)
+
+    def keys(self):
+        return self.index.keys()
+
+    def positions(self, key):
+        """Posições (base 0) das linhas da chave"""
+        return self.index.get(normalize_key(key), _NO_ROWS)
+
+    def view(self, key):
+        """Linhas da chave, mantendo o índice original (usado pelas páginas de Entrega)"""
+        if self.frame is None:
+            return None
+        return self.frame.take(self.positions(key))
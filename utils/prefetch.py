@@ -0,0 +1,34 @@
+"""
+Leituras antecipadas em paralelo.
+
+`prefetch` dispara a leitura em um pool de threads compartilhado (que usa o
+mesmo cliente da conexão) e devolve um `Future`; a página só chama
+`.result()` quando precisa do dado. Leituras com a mesma chave ainda em
+andamento são reaproveitadas, inclusive entre sessões, então Usuários e
+Cronograma chegam em max(latências) em vez da soma.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="prefetch")
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def prefetch(key, loader):
+    """
+    Inicia `loader()` em segundo plano (ou reaproveita a leitura em andamento).
+
+    A leitura roda sem o contexto de execução de script do Streamlit: como o
+    `Future` pode ser entregue a outras sessões, ela não pode pertencer à
+    sessão que a iniciou. Por isso `loader` não deve chamar `st.*`.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None and not future.done():
+            return future
+        future = _executor.submit(loader)
+        _inflight[key] = future
+        return future
@@ -0,0 +1,219 @@
+"""
+Agregados de andamento das entregas para o painel dos gestores.
+
+Para cada linha do Cronograma e cada entrega (1ª a 6ª) há três marcadores:
+prevista (data de entrega preenchida), avaliada (Avaliação preenchida) e
+validada (Validação igual a "Validado"). `ProgressAggregates` soma esses
+marcadores com groupby vetorizado por Referência, Setor, Responsável e pelas
+combinações Referência × Setor e Referência × Responsável.
+
+Os agregados são calculados uma vez por versão da planilha e depois só
+corrigidos:
+
+- cada edição enfileirada (`utils.write_queue`) soma a diferença do seu
+  marcador às linhas correspondentes de cada agregado (`patch`);
+- uma nova versão com as mesmas linhas é derivada da anterior pela
+  diferença entre os marcadores (`refreshed`), sem novo groupby.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.config import SPREADSHEET_URL, WORKSHEET_NAME
+from utils.connection import spreadsheet_key
+from utils.storage import ENTREGAS
+from utils.write_queue import get_write_queue
+
+METRICS = ["Previstas", "Avaliadas", "Validadas"]
+VALIDATED = "Validado"
+GROUP_COLUMNS = ["Referência", "Setor", "Responsável"]
+DIMENSIONS = [("Referência",), ("Setor",), ("Responsável",), ("Referência", "Setor"), ("Referência", "Responsável")]
+
+# Coluna da planilha → (métrica, entrega); a posição do marcador é métrica * 6 + entrega - 1
+FLAG_SOURCES = {}
+for _i in ENTREGAS:
+    FLAG_SOURCES[f"{_i}º Entrega"] = (0, _i)
+    FLAG_SOURCES[f"{_i}º Avaliação"] = (1, _i)
+    FLAG_SOURCES[f"Validação {_i}º Entrega"] = (2, _i)
+N_FLAGS = len(METRICS) * len(ENTREGAS)
+
+
+def _slot(metric, entrega):
+    return metric * len(ENTREGAS) + entrega - 1
+
+
+def _is_filled(value):
+    return not (value is None or value is pd.NaT or value != value or str(value).strip() == "")
+
+
+def cell_flag(column, value):
+    """(posição do marcador, valor 0/1) de uma célula editada, ou None se a coluna não conta"""
+    if column not in FLAG_SOURCES:
+        return None
+    metric, entrega = FLAG_SOURCES[column]
+    if metric == 2:
+        flag = _is_filled(value) and str(value).strip() == VALIDATED
+    else:
+        flag = _is_filled(value)
+    return _slot(metric, entrega), int(flag)
+
+
+def _text_flag(series, metric):
+    text = series.astype(object).where(series.notna(), "").astype(str).str.strip()
+    return (text == VALIDATED if metric == 2 else text != "").to_numpy(dtype=bool)
+
+
+def frame_flags(frame):
+    """Matriz (linhas × 18) de marcadores 0/1 do Cronograma"""
+    flags = np.zeros((len(frame), N_FLAGS), dtype=np.int8)
+    for column, (metric, entrega) in FLAG_SOURCES.items():
+        if column not in frame.columns:
+            continue
+        series = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            flag = series.notna().to_numpy()
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            # Marcador calculado por categoria e distribuído pelos códigos (-1 = vazio)
+            codes = series.cat.codes.to_numpy()
+            by_code = np.append(_text_flag(pd.Series(series.cat.categories), metric), False)
+            flag = by_code[codes]
+        else:
+            flag = _text_flag(series, metric)
+        flags[:, _slot(metric, entrega)] = flag
+    return flags
+
+
+class ProgressAggregates:
+    """Contagens por dimensão, corrigíveis célula a célula"""
+
+    def __init__(self, frame, version=None):
+        self.version = version
+        self._lock = threading.Lock()
+        self._frame = frame
+        self.keys = pd.Index(frame["key"].astype(str))
+        self.flags = frame_flags(frame)
+        self.dims = {}
+        columns = [str(i) for i in range(N_FLAGS)]
+        flags = pd.DataFrame(self.flags, columns=columns, index=frame.index)
+        for dim in DIMENSIONS:
+            grouped = flags.groupby([frame[c] for c in dim], observed=True, sort=True)
+            counts = grouped.sum()
+            self.dims[dim] = (grouped.ngroup().to_numpy(), counts.to_numpy(dtype=np.int64, copy=True),
+                              counts.index)
+
+    def _same_rows(self, frame):
+        """True se `frame` tem as mesmas linhas (chaves e grupos) que a versão agregada"""
+        if len(frame) != len(self._frame) or "key" not in frame.columns:
+            return False
+        if not (frame["key"].astype(str).to_numpy() == self.keys.to_numpy()).all():
+            return False
+        return all(frame[c].equals(self._frame[c]) or (frame[c].astype(str) == self._frame[c].astype(str)).all()
+                   for c in GROUP_COLUMNS if c in frame.columns)
+
+    def refreshed(self, frame, version=None):
+        """Agregados de uma nova versão: pela diferença dos marcadores se as linhas são as mesmas"""
+        if not self._same_rows(frame):
+            return ProgressAggregates(frame, version)
+        new = object.__new__(ProgressAggregates)
+        new.version = version
+        new._lock = threading.Lock()
+        new._frame = frame
+        new.keys = self.keys
+        with self._lock:
+            new.flags = frame_flags(frame)
+            diff = new.flags.astype(np.int64) - self.flags
+            rows = np.flatnonzero(diff.any(axis=1))
+            new.dims = {}
+            for dim, (codes, counts, index) in self.dims.items():
+                counts = counts.copy()
+                np.add.at(counts, codes[rows], diff[rows])
+                new.dims[dim] = (codes, counts, index)
+        return new
+
+    def patch(self, row_key, column, value):
+        """Aplica a edição de uma célula; retorna True se alguma contagem mudou"""
+        flag = cell_flag(column, value)
+        if flag is None:
+            return False
+        slot, new = flag
+        position = self.keys.get_indexer([str(row_key)])[0]
+        if position < 0:
+            return False
+        with self._lock:
+            delta = new - int(self.flags[position, slot])
+            if not delta:
+                return False
+            self.flags[position, slot] = new
+            for codes, counts, _ in self.dims.values():
+                counts[codes[position], slot] += delta
+        return True
+
+    def table(self, by, referencia=None, entrega=None):
+        """
+        Contagens por `by` (Referência, Setor ou Responsável), opcionalmente só
+        de uma Referência e de uma entrega (1 a 6; None = todas somadas).
+        """
+        dim = (by,) if referencia is None or by == "Referência" else ("Referência", by)
+        codes, counts, index = self.dims[dim]
+        with self._lock:
+            counts = counts.reshape(len(counts), len(METRICS), len(ENTREGAS)).copy()
+        values = counts.sum(axis=2) if entrega is None else counts[:, :, entrega - 1]
+        table = pd.DataFrame(values, index=index, columns=METRICS)
+        if len(dim) == 2:
+            table = table.xs(str(referencia), level=0) if str(referencia) in index.get_level_values(0) \
+                else table.iloc[:0].droplevel(0)
+        elif referencia is not None:
+            table = table.loc[[str(referencia)]] if str(referencia) in index else table.iloc[:0]
+        table.index.name = by
+        previstas = table["Previstas"].replace(0, np.nan)
+        table["% avaliadas"] = (100 * table["Avaliadas"] / previstas).round(1)
+        table["% validadas"] = (100 * table["Validadas"] / previstas).round(1)
+        return table
+
+    def by_entrega(self, referencia=None):
+        """Totais por número da entrega"""
+        dim = ("Referência",)
+        codes, counts, index = self.dims[dim]
+        with self._lock:
+            counts = counts.reshape(len(counts), len(METRICS), len(ENTREGAS)).copy()
+        if referencia is not None:
+            counts = counts[index == str(referencia)] if str(referencia) in index else counts[:0]
+        table = pd.DataFrame(counts.sum(axis=0).T, index=[f"{i}º Entrega" for i in ENTREGAS], columns=METRICS)
+        table.index.name = "Entrega"
+        return table
+
+
+# --- Agregados da versão atual (compartilhados pelo processo) ---
+_latest = None
+_latest_lock = threading.Lock()
+_cronograma_key = spreadsheet_key(SPREADSHEET_URL)
+
+
+def _on_cell_update(url, worksheet_name, row_key, column, value):
+    aggregates = _latest
+    if aggregates is not None and worksheet_name == WORKSHEET_NAME and url == _cronograma_key:
+        aggregates.patch(row_key, column, value)
+
+
+def _apply_pending(aggregates):
+    """Inclui as edições ainda na fila de escrita (leitura das próprias escritas)"""
+    for _, _, key_column, row_key, column, value in get_write_queue().pending(SPREADSHEET_URL, WORKSHEET_NAME):
+        if key_column == "key":
+            aggregates.patch(row_key, column, value)
+
+
+def get_progress(version, frame):
+    """Agregados da versão `version` do Cronograma (derivados da versão anterior quando possível)"""
+    global _latest
+    with _latest_lock:
+        if _latest is not None and _latest.version == version:
+            return _latest
+        if _latest is None:
+            get_write_queue().add_listener(_on_cell_update)
+            aggregates = ProgressAggregates(frame, version)
+        else:
+            aggregates = _latest.refreshed(frame, version)
+        _apply_pending(aggregates)
+        _latest = aggregates
+        return aggregates
@@ -0,0 +1,363 @@
+"""
+Agendador central das chamadas às APIs do Sheets e do Drive.
+
+Toda requisição passa por `RequestScheduler.call`, que:
+
+- consome um token do balde do projeto e do balde do usuário, dimensionados
+  pelas cotas do Google (Sheets: 300 leituras e 300 escritas por minuto por
+  projeto e 60 por minuto por usuário; Drive: 12.000 por minuto por
+  usuário). "Usuário" aqui é a conta que faz a chamada no Google, isto é, a
+  service account compartilhada por todas as sessões, e não o login do app;
+- quando falta token, atende primeiro as chamadas interativas (leituras da
+  página) e só depois as de segundo plano (fila de escrita, revalidações);
+- repete respostas 429/5xx e erros de conexão com backoff exponencial e
+  jitter. Escritas que não podem ser repetidas (`idempotent=False`: append,
+  batch_update estrutural, upload no Drive) só são repetidas em 429 ou em
+  falha de conexão antes do envio, pois um 5xx ou timeout pode chegar
+  depois de a escrita ter sido aplicada.
+
+`FakeClock` e `QuotaSimulator` permitem medir a vazão no limite da cota sem
+rede e sem esperar o tempo real.
+"""
+import heapq
+import itertools
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.metrics import get_metrics, note_retry
+
+# Prioridades (menor = atendido antes)
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# Cotas por minuto (https://developers.google.com/sheets/api/limits)
+QUOTAS = {
+    "read": 300,
+    "write": 300,
+    "drive": 1000,
+}
+# Cotas por minuto por usuário do Google (a service account)
+PER_USER_QUOTAS = {
+    "read": 60,
+    "write": 60,
+    "drive": 12000,
+}
+DEFAULT_USER = "service-account"
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # segundos
+BACKOFF_MAX = 64.0
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class RealClock:
+    """Relógio de parede"""
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait(self, condition, timeout):
+        condition.wait(timeout)
+
+
+class FakeClock:
+    """Relógio simulado: dormir apenas avança o tempo"""
+
+    def __init__(self, start=0.0):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def now(self):
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += max(seconds, 0.0)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def wait(self, condition, timeout):
+        # Libera o lock da condição como o relógio real faria
+        condition.release()
+        try:
+            self.advance(timeout if timeout is not None else 0.0)
+        finally:
+            condition.acquire()
+
+
+class TokenBucket:
+    """Balde de tokens com reposição contínua"""
+
+    def __init__(self, rate_per_minute, clock, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        # Rajada de ~6 s de cota: evita estourar a janela por minuto do Google
+        self.capacity = capacity if capacity is not None else max(1, rate_per_minute // 10)
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._updated = clock.now()
+
+    def _refill(self):
+        now = self._clock.now()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self):
+        """Segundos até existir um token (0 se já existe)"""
+        self._refill()
+        # Tolerância para o arredondamento da reposição contínua
+        if self.tokens >= 1 - 1e-9:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+def status_of(exc):
+    """Código HTTP de um erro do gspread, do googleapiclient ou do simulador"""
+    for attr in ("code", "status", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    resp = getattr(exc, "resp", None) or getattr(exc, "response", None)
+    for attr in ("status", "status_code"):
+        value = getattr(resp, attr, None)
+        if value is not None:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def is_retryable(exc):
+    """Cota estourada, erro do servidor ou falha de conexão"""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import requests
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+            return True
+    except ImportError:
+        pass
+    return status_of(exc) in RETRYABLE_STATUS
+
+
+def is_unsent(exc):
+    """Falha de conexão antes de a requisição sair (repeti-la não duplica a escrita)"""
+    if isinstance(exc, (ConnectionRefusedError, socket.gaierror)):
+        return True
+    try:
+        import requests
+        from urllib3.exceptions import ConnectTimeoutError
+    except ImportError:
+        return False
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.ConnectionError) and exc.args:
+        # requests embrulha o erro do urllib3 em MaxRetryError(reason=...)
+        reason = getattr(exc.args[0], "reason", exc.args[0])
+        return isinstance(reason, ConnectTimeoutError)
+    return False
+
+
+def is_resendable(exc):
+    """Erros em que uma escrita não idempotente pode ser repetida"""
+    return status_of(exc) == 429 or is_unsent(exc)
+
+
+_context = threading.local()
+
+
+@contextmanager
+def request_context(priority=None, user=None):
+    """
+    Define a prioridade e/ou o usuário das chamadas feitas nesta thread. O
+    usuário só deve ser informado para chamadas feitas com outras
+    credenciais; sem ele vale `DEFAULT_USER` (a service account).
+    """
+    previous = (getattr(_context, "priority", None), getattr(_context, "user", None))
+    if priority is not None:
+        _context.priority = priority
+    if user is not None:
+        _context.user = user
+    try:
+        yield
+    finally:
+        _context.priority, _context.user = previous
+
+
+def background():
+    """Atalho para marcar as chamadas da thread como de segundo plano"""
+    return request_context(priority=BACKGROUND)
+
+
+class RequestScheduler:
+    """Baldes por projeto e por usuário, fila de prioridade e retentativas"""
+
+    def __init__(self, quotas=None, per_user_quota=None, clock=None,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 rng=None):
+        self.clock = clock or RealClock()
+        self.quotas = dict(QUOTAS if quotas is None else quotas)
+        # Um número vale para todos os tipos; um dict define a cota de cada tipo
+        if per_user_quota is None:
+            per_user_quota = PER_USER_QUOTAS
+        if not isinstance(per_user_quota, dict):
+            per_user_quota = {kind: per_user_quota for kind in self.quotas}
+        self.per_user_quotas = dict(per_user_quota)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._rng = rng or random.Random()
+
+        self._condition = threading.Condition()
+        self._project = {kind: TokenBucket(rate, self.clock) for kind, rate in self.quotas.items()}
+        self._users = {}
+        self._waiting = []
+        self._tickets = itertools.count()
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+
+    def _user_bucket(self, kind, user):
+        key = (kind, user)
+        if key not in self._users:
+            self._users[key] = TokenBucket(self.per_user_quotas[kind], self.clock)
+        return self._users[key]
+
+    def acquire(self, kind="read", priority=None, user=None):
+        """Bloqueia até haver token para a chamada, respeitando a prioridade"""
+        priority = priority if priority is not None else getattr(_context, "priority", INTERACTIVE)
+        user = user or getattr(_context, "user", None) or DEFAULT_USER
+        started = self.clock.now()
+        with self._condition:
+            ticket = (priority, next(self._tickets))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    buckets = [self._project[kind], self._user_bucket(kind, user)]
+                    wait = max(b.wait_time() for b in buckets)
+                    if self._waiting[0] == ticket and wait == 0:
+                        for bucket in buckets:
+                            bucket.take()
+                        break
+                    # Quem não está na frente espera ser acordado; a frente espera o token
+                    self.clock.wait(self._condition, wait if self._waiting[0] == ticket else 0.05)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+            self.wait_seconds += self.clock.now() - started
+
+    def backoff(self, attempt):
+        """Espera da tentativa `attempt` (backoff exponencial com jitter total)"""
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, func, kind="read", priority=None, user=None, idempotent=True):
+        """
+        Executa `func` respeitando a cota e repetindo erros transitórios.
+        Com `idempotent=False` só repete 429 e falhas de conexão antes do envio.
+        """
+        retryable = is_retryable if idempotent else is_resendable
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            self.acquire(kind, priority, user)
+            self.calls += 1
+            try:
+                result = func()
+            except Exception as e:
+                if attempt >= self.max_retries or not retryable(e):
+                    self.failures += 1
+                    get_metrics().record_api(kind, time.perf_counter() - started, attempt, type(e).__name__)
+                    raise
+                self.retries += 1
+                note_retry()
+                self.clock.sleep(self.backoff(attempt))
+                attempt += 1
+            else:
+                get_metrics().record_api(kind, time.perf_counter() - started, attempt)
+                return result
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "wait_seconds": self.wait_seconds,
+        }
+
+
+class QuotaExceeded(Exception):
+    """Erro 429 devolvido pelo QuotaSimulator"""
+
+    status = 429
+
+
+class QuotaSimulator:
+    """
+    Substituto da API que aplica a cota por minuto em janela deslizante.
+
+    Cada chamada `request()` acima da cota levanta `QuotaExceeded` (429);
+    as demais levam `latency` segundos no relógio informado.
+    """
+
+    def __init__(self, clock, per_minute, latency=0.0):
+        self.clock = clock
+        self.per_minute = per_minute
+        self.latency = latency
+        self.accepted = []
+        self.rejected = 0
+
+    def request(self):
+        now = self.clock.now()
+        while self.accepted and now - self.accepted[0] >= 60:
+            self.accepted.pop(0)
+        if len(self.accepted) >= self.per_minute:
+            self.rejected += 1
+            raise QuotaExceeded("Quota exceeded")
+        self.accepted.append(now)
+        self.clock.sleep(self.latency)
+        return True
+
+
+def simulate_throughput(n_calls, per_minute, kind="read", latency=0.0):
+    """
+    Roda `n_calls` chamadas pelo agendador contra o simulador de cota.
+
+    Retorna (chamadas por minuto obtidas, 429 recebidos, retentativas).
+    """
+    clock = FakeClock()
+    scheduler = RequestScheduler(quotas={kind: per_minute}, per_user_quota=per_minute, clock=clock,
+                                 rng=random.Random(0))
+    api = QuotaSimulator(clock, per_minute, latency)
+    for _ in range(n_calls):
+        scheduler.call(api.request, kind=kind)
+    elapsed = clock.now()
+    rate = n_calls / elapsed * 60 if elapsed else float("inf")
+    return rate, api.rejected, scheduler.retries
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Retorna o agendador compartilhado do processo"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
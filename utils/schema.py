@@ -0,0 +1,114 @@
+"""
+Esquema tipado de ingestão do Cronograma.
+
+`compact_cronograma` converte as colunas de baixa cardinalidade em
+categóricas, as colunas de data em datetime64 e internaliza os textos
+repetidos das demais colunas, reduzindo o DataFrame mantido em cache.
+`frame_footprint` mede a memória real do DataFrame (textos repetidos que
+apontam para o mesmo objeto contam uma vez só).
+"""
+import sys
+
+import pandas as pd
+
+from utils.storage import ENTREGAS
+
+# Colunas de baixa cardinalidade (viram category)
+CRONOGRAMA_CATEGORIES = (
+    ["Referência", "Setor", "Responsável", "Responsável Área", "E-mail"]
+    + [f"{i}º Avaliação" for i in ENTREGAS]
+    + [f"Validação {i}º Entrega" for i in ENTREGAS]
+)
+# Colunas de data (convertidas só se todos os valores preenchidos forem datas)
+CRONOGRAMA_DATES = [f"{i}º Entrega" for i in ENTREGAS]
+DATE_FORMAT = "%d/%m/%Y"
+
+# Colunas de texto com menos valores distintos que isso (proporção) são internalizadas
+INTERN_MAX_RATIO = 0.5
+
+
+def _as_text(series):
+    """Texto uniforme para a coluna (o Sheets mistura números e textos)"""
+    return series.map(lambda v: "" if v is None or v != v else str(v))
+
+
+def to_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return _as_text(series).astype("category")
+
+
+def to_dates(series):
+    """Converte para datetime64 (vazios viram NaT) ou devolve None se houver texto que não é data"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    text = _as_text(series).str.strip()
+    dates = pd.to_datetime(text, format=DATE_FORMAT, errors="coerce")
+    if dates[text != ""].isna().any():
+        return None
+    return dates
+
+
+def intern_strings(series):
+    """Faz os textos iguais da coluna apontarem para o mesmo objeto"""
+    return pd.Series([sys.intern(v) if type(v) is str else v for v in series],
+                     index=series.index, name=series.name, dtype=object)
+
+
+def compact_frame(df, categories=(), dates=()):
+    """Aplica o esquema: categorias, datas e textos repetidos internalizados"""
+    if df is None or df.empty:
+        return df
+    df = df.copy()
+    for col in categories:
+        if col in df.columns:
+            df[col] = to_category(df[col])
+    for col in dates:
+        if col in df.columns:
+            converted = to_dates(df[col])
+            if converted is not None:
+                df[col] = converted
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object and series.nunique() <= len(series) * INTERN_MAX_RATIO:
+            df[col] = intern_strings(series)
+    return df
+
+
+def compact_cronograma(df):
+    return compact_frame(df, CRONOGRAMA_CATEGORIES, CRONOGRAMA_DATES)
+
+
+def display_value(value):
+    """Valor da célula para exibição (datas no formato da planilha, vazios como '')"""
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(DATE_FORMAT)
+    return value
+
+
+def _object_bytes(series):
+    """Ponteiros + objetos distintos (por identidade) de uma coluna object"""
+    seen = {}
+    for value in series:
+        seen.setdefault(id(value), value)
+    return series.memory_usage(index=False, deep=False) + sum(sys.getsizeof(v) for v in seen.values())
+
+
+def frame_footprint(df):
+    """
+    Memória do DataFrame em bytes: {'total': ..., 'columns': {coluna: bytes}}.
+
+    Diferente de `memory_usage(deep=True)`, textos internalizados contam uma
+    vez por coluna.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            columns[col] = int(_object_bytes(series))
+        else:
+            columns[col] = int(series.memory_usage(index=False, deep=True))
+    total = sum(columns.values()) + int(df.index.memory_usage(deep=True))
+    return {"total": total, "columns": columns}
@@ -0,0 +1,174 @@
+"""
+Busca no Cronograma: metas por palavras e pessoas por prefixo.
+
+`SearchIndex` é construído uma vez por versão do Cronograma:
+
+- "Descrição Meta": índice invertido palavra → metas, sem acentos e sem
+  diferença de maiúsculas. A última palavra digitada vale como prefixo
+  (busca enquanto digita) e a pontuação soma o IDF das palavras encontradas.
+- "Responsável" e "E-mail": índice de prefixos (as chaves ordenadas formam
+  uma trie achatada; um prefixo é uma faixa encontrada por bisect) sobre o
+  nome completo, cada palavra do nome, o e-mail e as partes do login.
+"""
+import bisect
+import re
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+GOAL_COLUMN = "Descrição Meta"
+PEOPLE_COLUMNS = ["Responsável", "E-mail"]
+MAX_PREFIX_WORDS = 500
+MAX_PREFIX_KEYS = 2000
+
+Match = namedtuple("Match", ["column", "value", "score"])
+
+_TOKEN = re.compile(r"\w+")
+_LOGIN_PARTS = re.compile(r"[._\-+]")
+
+
+def fold(text):
+    """Texto sem acentos, em minúsculas e sem espaços nas pontas"""
+    return unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().lower().strip()
+
+
+def tokenize(text):
+    return _TOKEN.findall(fold(text))
+
+
+def _fold_series(series):
+    """`fold` vetorizado para uma coluna de textos"""
+    return (series.astype(str).str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+            .str.lower().str.strip())
+
+
+class PrefixIndex:
+    """Chaves (já normalizadas) → códigos dos valores, consultadas por prefixo"""
+
+    def __init__(self, pairs):
+        keys, codes = zip(*pairs) if pairs else ((), ())
+        keys = np.asarray(keys, dtype=str)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order].tolist()
+        self.codes = np.asarray(codes, dtype=np.int64)[order]
+
+    def find(self, prefix):
+        """(códigos, pontuações); a pontuação é a fração da chave coberta pelo prefixo (1.0 = exata)"""
+        if not prefix:
+            return self.codes[:0], np.zeros(0)
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo)
+        hi = min(hi, lo + MAX_PREFIX_KEYS)
+        scores = len(prefix) / np.array([len(k) for k in self.keys[lo:hi]], dtype=float)
+        return self.codes[lo:hi], scores
+
+
+class SearchIndex:
+    """
+    Índices de busca de uma versão do Cronograma sobre os valores distintos de
+    cada coluna (`values` = {coluna: valores}; o código de um valor é a sua
+    posição, igual à do motor de filtros).
+    """
+
+    def __init__(self, values):
+        self.values = {c: np.asarray(v, dtype=object) for c, v in values.items()}
+        self.lengths = {c: np.array([len(str(x)) for x in v], dtype=float) for c, v in self.values.items()}
+        self._build_goals(self.values.get(GOAL_COLUMN, np.array([], dtype=object)))
+        self.people = {}
+        for column in PEOPLE_COLUMNS:
+            if column in self.values:
+                keys = self._email_keys if column == "E-mail" else self._name_keys
+                self.people[column] = PrefixIndex(list(keys(self.values[column])))
+
+    def _build_goals(self, goals):
+        self.n_goals = len(goals)
+        words = _fold_series(pd.Series(goals, dtype=object)).str.findall(_TOKEN.pattern).explode().dropna()
+        # Vocabulário em ordem alfabética: um prefixo vira uma faixa contígua
+        word_codes, vocabulary = pd.factorize(words, sort=True)
+        self.vocabulary = vocabulary.tolist()
+
+        # Pares (palavra, meta) sem repetição, agrupados por palavra (formato CSR)
+        n = max(1, len(goals))
+        pairs = np.sort(word_codes.astype(np.int64) * n + words.index.to_numpy())
+        pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])] if len(pairs) else pairs
+        pair_words, self.docs = np.divmod(pairs, n)
+        counts = np.bincount(pair_words, minlength=len(self.vocabulary))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        self.idf = np.log(1 + len(goals) / np.maximum(counts, 1))
+        # Peso total das palavras de cada meta (para normalizar a pontuação)
+        self.goal_weight = np.bincount(self.docs, weights=self.idf[pair_words], minlength=len(goals))
+
+    @staticmethod
+    def _name_keys(names):
+        for code, name in enumerate(names):
+            folded = fold(name)
+            if folded:
+                yield folded, code
+                for token in folded.split():
+                    yield token, code
+
+    @staticmethod
+    def _email_keys(emails):
+        for code, email in enumerate(emails):
+            folded = fold(email)
+            if folded:
+                yield folded, code
+                for part in _LOGIN_PARTS.split(folded.split("@")[0]):
+                    if part:
+                        yield part, code
+
+    def _word_range(self, token, prefix):
+        lo = bisect.bisect_left(self.vocabulary, token)
+        if not prefix:
+            return range(lo, lo + 1) if lo < len(self.vocabulary) and self.vocabulary[lo] == token else range(0)
+        hi = bisect.bisect_left(self.vocabulary, token + "\uffff", lo)
+        return range(lo, min(hi, lo + MAX_PREFIX_WORDS))
+
+    def goal_scores(self, query):
+        """(códigos, pontuações) das metas com todas as palavras (a última como prefixo)"""
+        tokens = tokenize(query)
+        if not tokens or not self.n_goals:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        total = np.zeros(self.n_goals)
+        matched = np.ones(self.n_goals, dtype=bool)
+        for i, token in enumerate(tokens):
+            scores = np.zeros(self.n_goals)
+            for w in self._word_range(token, prefix=i == len(tokens) - 1):
+                docs = self.docs[self.offsets[w]:self.offsets[w + 1]]
+                scores[docs] = np.maximum(scores[docs], self.idf[w])
+            matched &= scores > 0
+            total += scores
+        hits = np.flatnonzero(matched)
+        return hits, total[hits] / np.maximum(self.goal_weight[hits], 1e-9)
+
+    def search(self, query, allowed=None, limit=20):
+        """
+        Resultados [Match(coluna, valor, pontuação)] em ordem de relevância.
+        `allowed` ({coluna: máscara booleana por código}) restringe os valores.
+        """
+        candidates = [(GOAL_COLUMN, *self.goal_scores(query))]
+        folded = fold(query)
+        candidates += [(column, *index.find(folded)) for column, index in self.people.items()]
+
+        results = []
+        for column, codes, scores in candidates:
+            if allowed is not None and column in allowed:
+                keep = allowed[column][codes]
+                codes, scores = codes[keep], scores[keep]
+            if column != GOAL_COLUMN and len(codes):
+                # Um valor pode vir de várias chaves (nome, palavras): fica a melhor pontuação
+                order = np.argsort(-scores, kind="stable")
+                codes, scores = codes[order], scores[order]
+                _, first = np.unique(codes, return_index=True)
+                codes, scores = codes[first], scores[first]
+            # Só os melhores de cada coluna entram na ordenação final (empate: valor mais curto)
+            if len(codes) > limit:
+                best = np.argpartition(-scores + 1e-6 * self.lengths[column][codes], limit - 1)[:limit]
+                codes, scores = codes[best], scores[best]
+            values = self.values[column]
+            results += [Match(column, values[c], s) for c, s in zip(codes.tolist(), scores.tolist())]
+        results.sort(key=lambda m: (-m.score, len(m.value), m.value))
+        return results[:limit]
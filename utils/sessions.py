@@ -0,0 +1,215 @@
+"""
+Sessões de login no servidor, para que recarregar a página ou abrir uma nova
+aba não exija novo login.
+
+No login o app cria uma sessão no SQLite local (`SESSION_DB`) com os dados
+do usuário e recebe um token assinado (HMAC-SHA256) com validade
+(`SESSION_TTL`). O token fica em um cookie (`COOKIE_NAME`), nunca na URL,
+para não ir parar no histórico, em favoritos ou em links compartilhados. Ao
+recarregar ou abrir uma nova aba, o app lê o cookie (`st.context.cookies`),
+confere a assinatura e a validade, lê a sessão do SQLite e restaura
+`user_info`, `email` e `tipo_usuario` sem consultar o Google Sheets. Sair
+revoga a sessão e apaga o cookie.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from utils.config import CACHE_DIR, SESSION_DB, SESSION_SECRET, SESSION_TTL
+
+COOKIE_NAME = "ppr_sessao"
+# Parâmetro da URL usado por versões anteriores (removido ao abrir a página)
+TOKEN_PARAM = "sessao"
+SECRET_PATH = os.path.join(CACHE_DIR, "session_secret")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    login TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+def _load_secret():
+    """Chave configurada ou a gerada na primeira execução (guardada com permissão 600)"""
+    if SESSION_SECRET:
+        return SESSION_SECRET.encode()
+    try:
+        with open(SECRET_PATH, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(SECRET_PATH) or ".", exist_ok=True)
+    secret = secrets.token_bytes(32)
+    try:
+        fd = os.open(SECRET_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Outro processo gerou a chave ao mesmo tempo: usa a dele
+        with open(SECRET_PATH, "rb") as f:
+            return f.read()
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    return secret
+
+
+class SessionStore:
+    """Sessões em SQLite com tokens assinados '<id>.<validade>.<assinatura>'"""
+
+    def __init__(self, path=SESSION_DB, secret=None, ttl=SESSION_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self._secret = secret if secret is not None else _load_secret()
+        self._clock = clock
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._db:
+            if path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+            # Sessões gravadas antes de a senha sair do registro do usuário
+            self._db.execute("UPDATE sessions SET data = json_remove(data, '$.user_info.Senha') "
+                             "WHERE json_extract(data, '$.user_info.Senha') IS NOT NULL")
+
+    def _sign(self, payload):
+        digest = hmac.new(self._secret, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def _parse(self, token):
+        """(id, validade) de um token com assinatura válida e não vencido, senão None"""
+        try:
+            session_id, expires, signature = str(token).split(".")
+            expires = int(expires)
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._sign(f"{session_id}.{expires}")):
+            return None
+        if expires < self._clock():
+            return None
+        return session_id, expires
+
+    def create(self, data):
+        """Grava a sessão com os dados do usuário; retorna o token"""
+        session_id = secrets.token_urlsafe(18)
+        now = self._clock()
+        expires = int(now + self.ttl)
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO sessions (id, login, data, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                             (session_id, str(data.get("user_info", {}).get("Login", "")),
+                              json.dumps(data, default=str), now, expires))
+        return f"{session_id}.{expires}.{self._sign(f'{session_id}.{expires}')}"
+
+    def restore(self, token):
+        """Dados da sessão do token, ou None se o token for inválido, vencido ou revogado"""
+        parsed = self._parse(token)
+        if parsed is None:
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT data, expires_at FROM sessions WHERE id = ?", (parsed[0],)).fetchone()
+        if row is None or row[1] < self._clock():
+            return None
+        return json.loads(row[0])
+
+    def revoke(self, token):
+        parsed = self._parse(token)
+        if parsed is None:
+            return False
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (parsed[0],))
+        return True
+
+    def purge_expired(self):
+        """Remove as sessões vencidas; retorna quantas"""
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM sessions WHERE expires_at < ?", (self._clock(),)).rowcount
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Retorna o armazenamento de sessões compartilhado do processo"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+            _store.purge_expired()
+        return _store
+
+
+# --- Integração com o st.session_state ---
+SESSION_KEYS = ["user_info", "email", "tipo_usuario"]
+
+
+def _cookie_token():
+    """Token do cookie enviado na conexão da sessão (ou None)"""
+    return st.context.cookies.get(COOKIE_NAME)
+
+
+def _write_cookie(token, max_age):
+    """Grava (ou apaga, com max_age=0) o cookie da sessão no navegador"""
+    cookie = f"{COOKIE_NAME}={token}; Max-Age={int(max_age)}; Path=/; SameSite=Strict"
+    st.html(f"<script>document.cookie = {json.dumps(cookie)} + "
+            f"(location.protocol === 'https:' ? '; Secure' : '');</script>",
+            unsafe_allow_javascript=True)
+
+
+def start_session(user_info):
+    """Cria a sessão do usuário recém-autenticado (o cookie é gravado por `ensure_session`)"""
+    # A senha nunca vai para o banco de sessões
+    user_info = {c: v for c, v in user_info.items() if c != "Senha"}
+    data = {"user_info": user_info, "email": user_info["Email"], "tipo_usuario": user_info["Tipo de Usuário"]}
+    token = get_session_store().create(data)
+    st.session_state["session_token"] = token
+    return token
+
+
+def ensure_session():
+    """
+    Restaura o login a partir do cookie (recarga ou nova aba) e grava o cookie
+    enquanto o navegador ainda não o tem. Retorna True se o usuário está logado.
+    """
+    if TOKEN_PARAM in st.query_params:
+        del st.query_params[TOKEN_PARAM]
+
+    if st.session_state.get("logged_in"):
+        token = st.session_state.get("session_token")
+        # `st.context.cookies` reflete a conexão: após o login o cookie só
+        # aparece na próxima recarga, então é regravado até lá
+        if token and _cookie_token() != token:
+            _write_cookie(token, get_session_store().ttl)
+        return True
+
+    token = _cookie_token()
+    if not token:
+        return False
+    data = get_session_store().restore(token)
+    if data is None:
+        _write_cookie("", 0)
+        return False
+    for key in SESSION_KEYS:
+        st.session_state[key] = data[key]
+    st.session_state["session_token"] = token
+    st.session_state["logged_in"] = True
+    return True
+
+
+def end_session():
+    """Revoga a sessão atual e apaga o cookie"""
+    token = st.session_state.get("session_token") or _cookie_token()
+    if token:
+        get_session_store().revoke(token)
+    _write_cookie("", 0)
@@ -0,0 +1,108 @@
+"""
+Snapshots locais das abas em formato colunar (Arrow IPC / Feather v2).
+
+Cada leitura completa bem-sucedida de uma aba é gravada em disco junto com a
+versão da planilha. Após um reinício ou limpeza de cache, o app carrega o
+snapshot (mapeado em memória, sem compressão) em vez de esperar o download
+e revalida em segundo plano.
+"""
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils.config import CACHE_DIR
+from utils.connection import spreadsheet_key
+from utils.scheduler import background
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+
+Snapshot = namedtuple("Snapshot", ["data", "version", "saved_at"])
+
+
+def snapshot_name(url, worksheet_name):
+    """Nome do snapshot de uma aba (seguro para usar como nome de arquivo)"""
+    return re.sub(r"[^\w.-]", "_", f"{spreadsheet_key(url)}__{worksheet_name}")
+
+
+def snapshot_path(name, directory=SNAPSHOT_DIR):
+    return os.path.join(directory, f"{name}.arrow")
+
+
+def _arrow_safe(df):
+    """Converte colunas object com tipos mistos (ex.: números e textos do Sheets) em texto"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object and df[col].map(type).nunique() > 1:
+            df[col] = df[col].astype(str)
+    return df
+
+
+def save_snapshot(name, df, version=None, directory=SNAPSHOT_DIR):
+    """Grava o DataFrame e a versão de forma atômica; retorna o caminho"""
+    os.makedirs(directory, exist_ok=True)
+    table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"ppr_version"] = "" if version is None else str(version)
+    metadata[b"ppr_saved_at"] = str(time.time())
+    table = table.replace_schema_metadata(metadata)
+
+    path = snapshot_path(name, directory)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    # Sem compressão para permitir o mapeamento em memória na leitura
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(name, directory=SNAPSHOT_DIR, memory_map=True, version=None):
+    """
+    Carrega o snapshot (ou None se não existir ou estiver corrompido).
+
+    Com `version`, lê primeiro só os metadados do arquivo e retorna None sem
+    montar a tabela se o snapshot for de outra versão.
+    """
+    path = snapshot_path(name, directory)
+    if not os.path.exists(path):
+        return None
+    try:
+        source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+        with source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            stored = metadata.get(b"ppr_version", b"").decode() or None
+            if version is not None and stored != str(version):
+                return None
+            df = reader.read_all().to_pandas()
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"Snapshot '{name}' ignorado: {e}")
+        return None
+    saved_at = float(metadata.get(b"ppr_saved_at", b"0").decode())
+    return Snapshot(df, stored, saved_at)
+
+
+_revalidations = {}
+_revalidations_lock = threading.Lock()
+
+
+def revalidate_in_background(task, name="snapshot-revalidate"):
+    """Executa `task` em uma thread daemon, sem duplicar revalidações em andamento"""
+    def run():
+        try:
+            with background():
+                task()
+        except Exception as e:
+            print(f"Erro ao revalidar snapshot: {e}")
+
+    with _revalidations_lock:
+        thread = _revalidations.get(name)
+        if thread is not None and thread.is_alive():
+            return thread
+        thread = threading.Thread(target=run, name=name, daemon=True)
+        _revalidations[name] = thread
+        thread.start()
+        return thread
@@ -0,0 +1,335 @@
+"""
+Backends de armazenamento do PPR.
+
+`StorageBackend` define as operações usadas pelo app: ler aba, ler faixa de
+linhas (ou a aba inteira em blocos), atualizar células, inserir linhas e
+enviar documento.
+`SheetsBackend` usa o Google Sheets/Drive; `SQLiteBackend` guarda as mesmas
+abas (Cronograma e Usuários) em um SQLite local ou em memória, o que permite
+rodar, testar carga e medir o app sem rede. O backend é escolhido por
+`STORAGE_BACKEND` em `utils.config`. `get_backend` devolve o backend
+envolto em `InstrumentedBackend`, que registra cada chamada em
+`utils.metrics`.
+"""
+import os
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from utils.config import (SPREADSHEET_URL, SQLITE_PATH, STORAGE_BACKEND, UPLOAD_DIR,
+                          USERS_SHEET, WORKSHEET_NAME)
+from utils.connection import spreadsheet_key
+from utils import google_sheets
+from utils.google_drive import get_file_version, upload_file_to_drive
+from utils.metrics import track
+
+ENTREGAS = range(1, 7)
+
+CRONOGRAMA_COLUMNS = (
+    ["key", "Referência", "Setor", "Responsável", "Responsável Área", "E-mail", "Descrição Meta"]
+    + [f"{i}º Entrega" for i in ENTREGAS]
+    + [f"{i}º Avaliação" for i in ENTREGAS]
+    + [f"Validação {i}º Entrega" for i in ENTREGAS]
+    + [f"Doc{i}" for i in ENTREGAS]
+)
+USERS_COLUMNS = ["Login", "Email", "Senha", "Tipo de Usuário", "Data de Cadastro"]
+
+# Esquema das abas usadas pelo app
+SCHEMAS = {
+    WORKSHEET_NAME: CRONOGRAMA_COLUMNS,
+    USERS_SHEET: USERS_COLUMNS,
+}
+
+
+class StorageBackend:
+    """Interface comum de acesso aos dados do PPR"""
+
+    name = "base"
+
+    def read_tab(self, tab, columns=None, dtypes=None):
+        """Lê a aba inteira como DataFrame (opcionalmente só algumas colunas)"""
+        raise NotImplementedError
+
+    def read_rows(self, tab, start, stop, columns=None, dtypes=None):
+        """Lê as linhas de dados [start, stop) (base 0, sem o cabeçalho)"""
+        raise NotImplementedError
+
+    def iter_chunks(self, tab, chunk_rows=google_sheets.CHUNK_ROWS, columns=None, dtypes=None):
+        """Gera a aba em DataFrames de até `chunk_rows` linhas (um bloco em memória por vez)"""
+        start = 0
+        while True:
+            chunk = self.read_rows(tab, start, start + chunk_rows, columns=columns, dtypes=dtypes)
+            if chunk is None or chunk.empty:
+                return
+            yield chunk
+            if len(chunk) < chunk_rows:
+                return
+            start += chunk_rows
+
+    def update_cells(self, tab, updates, key_column="key"):
+        """
+        Atualiza células dadas como (chave da linha, coluna, valor).
+        Retorna a lista de (chave, coluna) escritas (None se a aba não existir).
+        """
+        raise NotImplementedError
+
+    def append_rows(self, tab, rows):
+        """Insere linhas (listas posicionais) no fim da aba"""
+        raise NotImplementedError
+
+    def upload_document(self, file, filename, mimetype):
+        """Armazena o documento e retorna o link para acessá-lo"""
+        raise NotImplementedError
+
+    def get_version(self, tab):
+        """Identificador barato que muda sempre que a aba muda"""
+        raise NotImplementedError
+
+
+class SheetsBackend(StorageBackend):
+    """Backend do Google Sheets/Drive (usa a conexão compartilhada)"""
+
+    name = "sheets"
+
+    def __init__(self, url=SPREADSHEET_URL):
+        self.url = url
+
+    def read_tab(self, tab, columns=None, dtypes=None):
+        return google_sheets.read_sheet_to_dataframe(self.url, tab, columns=columns, dtypes=dtypes)
+
+    def read_rows(self, tab, start, stop, columns=None, dtypes=None):
+        return google_sheets.read_sheet_to_dataframe(self.url, tab, columns=columns, rows=(start, stop),
+                                                     dtypes=dtypes)
+
+    def iter_chunks(self, tab, chunk_rows=google_sheets.CHUNK_ROWS, columns=None, dtypes=None):
+        return google_sheets.iter_sheet_chunks(self.url, tab, chunk_rows, columns=columns, dtypes=dtypes)
+
+    def update_cells(self, tab, updates, key_column="key"):
+        return google_sheets.update_cells_by_key(self.url, tab, updates, key_column)
+
+    def append_rows(self, tab, rows):
+        return google_sheets.append_rows_to_sheet(self.url, tab, rows)
+
+    def upload_document(self, file, filename, mimetype):
+        return upload_file_to_drive(file, filename, mimetype)
+
+    def get_version(self, tab):
+        # A versão do Drive é da planilha inteira: qualquer aba alterada a incrementa
+        return get_file_version(spreadsheet_key(self.url))
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Backend local em SQLite com o mesmo esquema das abas do Sheets.
+
+    Cada aba vira uma tabela com a coluna interna `_row` (ordem das linhas);
+    as colunas não têm tipo declarado, então números continuam números.
+    Use `path=':memory:'` para um banco descartável em memória.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH, upload_dir=UPLOAD_DIR, schemas=SCHEMAS):
+        self.path = path
+        self.upload_dir = upload_dir
+        self._lock = threading.RLock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS _versions (tab TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        for tab, columns in schemas.items():
+            self._ensure_table(tab, columns)
+
+    def _ensure_table(self, tab, columns):
+        cols = ", ".join(_quote(c) for c in columns)
+        with self._lock, self._db:
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {_quote(tab)} (_row INTEGER PRIMARY KEY, {cols})")
+
+    def _bump_version(self, tab):
+        self._db.execute(
+            "INSERT INTO _versions (tab, version) VALUES (?, 1) "
+            "ON CONFLICT (tab) DO UPDATE SET version = version + 1", (tab,))
+
+    def get_version(self, tab):
+        with self._lock:
+            row = self._db.execute("SELECT version FROM _versions WHERE tab = ?", (tab,)).fetchone()
+        return row[0] if row else 0
+
+    def columns(self, tab):
+        """Colunas da aba (None se a aba não existir)"""
+        with self._lock:
+            info = self._db.execute(f"PRAGMA table_info({_quote(tab)})").fetchall()
+        return [c[1] for c in info if c[1] != "_row"] or None
+
+    def _select(self, tab, columns=None, dtypes=None, suffix="", params=()):
+        available = self.columns(tab)
+        if available is None:
+            return None
+        columns = list(columns) if columns is not None else available
+        for name in columns:
+            if name not in available:
+                raise KeyError(f"Coluna '{name}' não existe na aba")
+        cols = ", ".join(_quote(c) for c in columns)
+        with self._lock:
+            rows = self._db.execute(f"SELECT {cols} FROM {_quote(tab)} ORDER BY _row {suffix}", params).fetchall()
+        rows = [["" if v is None else v for v in r] for r in rows]
+        df = pd.DataFrame(rows, columns=columns)
+        return df.astype(dtypes) if dtypes else df
+
+    def read_tab(self, tab, columns=None, dtypes=None):
+        return self._select(tab, columns, dtypes)
+
+    def read_rows(self, tab, start, stop, columns=None, dtypes=None):
+        df = self._select(tab, columns, dtypes, "LIMIT ? OFFSET ?", (max(stop - start, 0), start))
+        if df is not None:
+            df.index = range(start, start + len(df))
+        return df
+
+    def update_cells(self, tab, updates, key_column="key"):
+        columns = self.columns(tab)
+        if columns is None:
+            return None
+        written = []
+        with self._lock, self._db:
+            for row_key, column, value in updates:
+                if column not in columns or key_column not in columns:
+                    continue
+                cursor = self._db.execute(
+                    f"UPDATE {_quote(tab)} SET {_quote(column)} = ? WHERE CAST({_quote(key_column)} AS TEXT) = ?",
+                    (google_sheets.plain_value(value), str(row_key)))
+                if cursor.rowcount:
+                    written.append((row_key, column))
+            if written:
+                self._bump_version(tab)
+        return written
+
+    def append_rows(self, tab, rows):
+        columns = self.columns(tab)
+        if columns is None:
+            return False
+        cols = ", ".join(_quote(c) for c in columns)
+        marks = ", ".join("?" for _ in columns)
+        values = [[google_sheets.plain_value(v) for v in row][:len(columns)] + [""] * (len(columns) - len(row))
+                  for row in rows]
+        with self._lock, self._db:
+            self._db.executemany(f"INSERT INTO {_quote(tab)} ({cols}) VALUES ({marks})", values)
+            self._bump_version(tab)
+        return True
+
+    def upload_document(self, file, filename, mimetype):
+        os.makedirs(self.upload_dir, exist_ok=True)
+        target = Path(self.upload_dir) / f"{uuid.uuid4().hex}_{os.path.basename(filename)}"
+        target.write_bytes(file.read())
+        return target.resolve().as_uri()
+
+    def load_dataframe(self, tab, dataframe):
+        """Substitui o conteúdo da aba pelo DataFrame (carga inicial, benchmarks)"""
+        with self._lock, self._db:
+            self._db.execute(f"DROP TABLE IF EXISTS {_quote(tab)}")
+        self._ensure_table(tab, [str(c) for c in dataframe.columns])
+        self.append_rows(tab, google_sheets.dataframe_to_values(dataframe))
+
+
+def _count_frame(call, df):
+    if df is not None:
+        call["rows"] += len(df)
+        call["cells"] += df.size
+
+
+class InstrumentedBackend(StorageBackend):
+    """Registra operação, aba, linhas, células, bytes, latência e retentativas de cada chamada"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+
+    def __getattr__(self, name):
+        # Demais métodos (ex.: load_dataframe do SQLite) vão direto ao backend
+        return getattr(self.inner, name)
+
+    def read_tab(self, tab, columns=None, dtypes=None):
+        with track("read_tab", tab, self.name) as call:
+            df = self.inner.read_tab(tab, columns=columns, dtypes=dtypes)
+            _count_frame(call, df)
+            return df
+
+    def read_rows(self, tab, start, stop, columns=None, dtypes=None):
+        with track("read_rows", tab, self.name) as call:
+            df = self.inner.read_rows(tab, start, stop, columns=columns, dtypes=dtypes)
+            _count_frame(call, df)
+            return df
+
+    def iter_chunks(self, tab, chunk_rows=google_sheets.CHUNK_ROWS, columns=None, dtypes=None):
+        chunks = self.inner.iter_chunks(tab, chunk_rows, columns=columns, dtypes=dtypes)
+        while True:
+            # Cada bloco é uma chamada
+            with track("read_chunk", tab, self.name) as call:
+                chunk = next(chunks, None)
+                _count_frame(call, chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    def update_cells(self, tab, updates, key_column="key"):
+        updates = list(updates)
+        with track("update_cells", tab, self.name) as call:
+            call["rows"] = len({str(row_key) for row_key, _, _ in updates})
+            call["cells"] = len(updates)
+            return self.inner.update_cells(tab, updates, key_column)
+
+    def append_rows(self, tab, rows):
+        rows = list(rows)
+        with track("append_rows", tab, self.name) as call:
+            call["rows"] = len(rows)
+            call["cells"] = sum(len(row) for row in rows)
+            return self.inner.append_rows(tab, rows)
+
+    def upload_document(self, file, filename, mimetype):
+        with track("upload_document", None, self.name):
+            return self.inner.upload_document(file, filename, mimetype)
+
+    def get_version(self, tab):
+        with track("get_version", tab, self.name):
+            return self.inner.get_version(tab)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def create_backend(kind=STORAGE_BACKEND, url=SPREADSHEET_URL):
+    """Cria um backend do tipo indicado ('sheets', 'sqlite' ou 'memory')"""
+    if kind == "sheets":
+        return SheetsBackend(url)
+    if kind == "sqlite":
+        return SQLiteBackend(SQLITE_PATH)
+    if kind == "memory":
+        return SQLiteBackend(":memory:")
+    raise ValueError(f"Backend de armazenamento desconhecido: '{kind}'")
+
+
+def get_backend(url=SPREADSHEET_URL):
+    """Retorna o backend configurado para a planilha (compartilhado no processo)"""
+    # Os backends locais guardam uma única "planilha", então a URL é ignorada
+    key = spreadsheet_key(url) if STORAGE_BACKEND == "sheets" else STORAGE_BACKEND
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = InstrumentedBackend(create_backend(STORAGE_BACKEND, url))
+        return _backends[key]
+
+
+def set_backend(backend, url=SPREADSHEET_URL):
+    """Instala um backend já criado (ex.: SQLite semeado em benchmarks)"""
+    key = spreadsheet_key(url) if STORAGE_BACKEND == "sheets" else STORAGE_BACKEND
+    if not isinstance(backend, InstrumentedBackend):
+        backend = InstrumentedBackend(backend)
+    with _backends_lock:
+        _backends[key] = backend
@@ -0,0 +1,82 @@
+"""
+Cadastro de usuários (aba Usuários) para login e cadastro.
+
+`UserDirectory` guarda os usuários como um dicionário Login → registro, então
+o login é uma consulta O(1) em vez de varrer o DataFrame. O diretório é
+carregado só quando alguém passa pela tela de login ou de cadastro, é
+compartilhado pelo processo e só é baixado de novo quando a versão da aba
+muda (`utils.freshness`). Um novo cadastro entra no dicionário na hora.
+"""
+import threading
+
+from utils.config import USERS_LOGIN_COLUMNS, USERS_SHEET
+from utils.freshness import get_version_gate
+from utils.storage import USERS_COLUMNS, get_backend
+
+
+def _login_key(login):
+    return "" if login is None else str(login)
+
+
+class UserDirectory:
+    """Usuários indexados pelo Login"""
+
+    def __init__(self, df=None, version=None):
+        self.version = version
+        self._lock = threading.Lock()
+        self._by_login = {}
+        if df is not None and not df.empty:
+            columns = [c for c in USERS_LOGIN_COLUMNS if c in df.columns]
+            for record in df[columns].to_dict("records"):
+                # Logins repetidos: vale o primeiro, como na busca anterior
+                self._by_login.setdefault(_login_key(record.get("Login")), record)
+
+    def __len__(self):
+        return len(self._by_login)
+
+    def __contains__(self, login):
+        return _login_key(login) in self._by_login
+
+    def get(self, login):
+        return self._by_login.get(_login_key(login))
+
+    def authenticate(self, login, senha):
+        """Registro do usuário (dict, sem a senha) se login e senha conferem, senão None"""
+        record = self.get(login)
+        if record is None or str(record.get("Senha")) != str(senha):
+            return None
+        return {c: v for c, v in record.items() if c != "Senha"}
+
+    def add(self, row):
+        """Inclui um usuário recém-cadastrado (linha na ordem de USERS_COLUMNS)"""
+        record = dict(zip(USERS_COLUMNS, row))
+        with self._lock:
+            self._by_login.setdefault(_login_key(record["Login"]),
+                                      {c: record.get(c, "") for c in USERS_LOGIN_COLUMNS})
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def get_user_directory():
+    """Diretório da versão atual da aba Usuários (baixa de novo só se a versão mudou)"""
+    global _directory
+    gate = get_version_gate(USERS_SHEET)
+    version = gate.version()
+    with _directory_lock:
+        if _directory is None or _directory.version != version:
+            df = gate.fetch(lambda: get_backend().read_tab(USERS_SHEET, columns=USERS_LOGIN_COLUMNS))
+            if df is None:
+                print(f"Erro ao carregar a aba '{USERS_SHEET}'")
+                return _directory or UserDirectory()
+            _directory = UserDirectory(df, version)
+        return _directory
+
+
+def register_user(row):
+    """Grava o novo usuário na planilha e no diretório em memória; retorna True se gravou"""
+    if get_backend().append_rows(USERS_SHEET, [row]) is False:
+        return False
+    get_user_directory().add(row)
+    return True
@@ -0,0 +1,304 @@
+"""
+Fila de escrita assíncrona (write-behind) para as edições de avaliação.
+
+Cada salvamento grava a célula em um journal SQLite local e retorna na hora.
+Uma thread em segundo plano junta as edições pendentes de todas as sessões e
+as envia periodicamente em um `batch_update` por aba, mantendo apenas o
+último valor de cada célula. Como o journal fica em disco, edições não
+enviadas são reenviadas após uma queda ou reinício do servidor.
+
+Os valores são guardados em JSON, mantendo o tipo (número, texto). Só saem
+do journal as células de fato escritas; as que a planilha não tem (chave ou
+coluna inexistente) continuam no journal e, após `MAX_SKIPS` envios sem
+sucesso, deixam de ser reenviadas, não entram mais no `overlay` e aparecem
+como `stuck` nas métricas.
+
+As células são endereçadas por (chave da linha, nome da coluna) e enviadas
+pelo backend de armazenamento configurado (`utils.storage`).
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from utils.config import CACHE_DIR
+from utils.connection import spreadsheet_key
+from utils.google_sheets import plain_value
+from utils.scheduler import background
+from utils.storage import get_backend
+
+JOURNAL_PATH = os.path.join(CACHE_DIR, "write_journal.sqlite3")
+FLUSH_INTERVAL = 2.0  # segundos entre envios
+LATENCY_WINDOW = 100  # envios considerados nas métricas de latência
+MAX_SKIPS = 5  # envios em que a célula não foi encontrada até parar de reenviá-la
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    url TEXT NOT NULL,
+    worksheet TEXT NOT NULL,
+    key_column TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    col TEXT NOT NULL,
+    value TEXT,
+    seq INTEGER NOT NULL,
+    enqueued_at REAL NOT NULL,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (url, worksheet, key_column, row_key, col)
+)
+"""
+
+
+def _encode(value):
+    return json.dumps(value, default=str)
+
+
+def _decode(text):
+    # Journals anteriores guardavam o texto puro
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        return text
+
+
+class WriteBehindQueue:
+    """Journal SQLite + thread que agrupa e envia as edições pendentes"""
+
+    def __init__(self, journal_path=JOURNAL_PATH, flush_interval=FLUSH_INTERVAL):
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+        self._listeners = []
+
+        self._enqueued = 0
+        self._coalesced = 0
+        self._flushes = 0
+        self._cells_flushed = 0
+        self._errors = 0
+        self._last_error = None
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+        directory = os.path.dirname(journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(_SCHEMA)
+            if "skipped" not in [c[1] for c in db.execute("PRAGMA table_info(pending)")]:
+                db.execute("ALTER TABLE pending ADD COLUMN skipped INTEGER NOT NULL DEFAULT 0")
+            row = db.execute("SELECT COALESCE(MAX(seq), 0) FROM pending").fetchone()
+        self._seq = row[0]
+
+    def _connect(self):
+        return sqlite3.connect(self.journal_path, timeout=30)
+
+    # --- Enfileiramento ---
+    def enqueue(self, url, worksheet_name, row_key, column, value, key_column="key"):
+        """Grava a edição no journal e retorna imediatamente"""
+        url, value = spreadsheet_key(url), plain_value(value)
+        with self._lock:
+            self._seq += 1
+            with self._connect() as db:
+                replaced = db.execute(
+                    "SELECT 1 FROM pending WHERE url=? AND worksheet=? AND key_column=? AND row_key=? AND col=?",
+                    (url, worksheet_name, key_column, str(row_key), column)).fetchone()
+                db.execute(
+                    "INSERT INTO pending (url, worksheet, key_column, row_key, col, value, seq, enqueued_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (url, worksheet, key_column, row_key, col) DO UPDATE SET "
+                    "value=excluded.value, seq=excluded.seq, enqueued_at=excluded.enqueued_at, skipped=0",
+                    (url, worksheet_name, key_column, str(row_key), column, _encode(value), self._seq, time.time()))
+            self._enqueued += 1
+            if replaced:
+                self._coalesced += 1
+        for listener in list(self._listeners):
+            try:
+                listener(url, worksheet_name, str(row_key), column, value)
+            except Exception as e:
+                print(f"Erro ao notificar a edição de '{worksheet_name}': {e}")
+        self.start()
+        return True
+
+    def add_listener(self, callback):
+        """Chama `callback(url, aba, chave, coluna, valor)` a cada edição enfileirada"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def pending(self, url=None, worksheet_name=None, stuck=False):
+        """
+        Lista as edições pendentes como (url, aba, coluna chave, chave, coluna, valor).
+
+        Com `stuck=True` lista as que deixaram de ser reenviadas (não
+        encontradas na planilha em `MAX_SKIPS` envios) em vez das pendentes.
+        """
+        query = "SELECT url, worksheet, key_column, row_key, col, value FROM pending WHERE "
+        query += "skipped >= ?" if stuck else "skipped < ?"
+        params = (MAX_SKIPS,)
+        if url is not None:
+            query += " AND url=? AND worksheet=?"
+            params += (spreadsheet_key(url), worksheet_name)
+        with self._connect() as db:
+            rows = db.execute(query + " ORDER BY seq", params).fetchall()
+        return [row[:5] + (_decode(row[5]),) for row in rows]
+
+    def stuck_cells(self, url, worksheet_name, key_column="key"):
+        """Células (chave, coluna) da aba que deixaram de ser reenviadas"""
+        return {(row_key, column) for _, _, kc, row_key, column, _ in self.pending(url, worksheet_name, stuck=True)
+                if kc == key_column}
+
+    def overlay(self, df, url, worksheet_name, key_column="key"):
+        """
+        Aplica ao DataFrame os valores ainda não enviados (leitura das próprias
+        escritas). Edições que deixaram de ser reenviadas não são aplicadas:
+        elas nunca chegarão à planilha (ver `stuck_cells`).
+        """
+        entries = [e for e in self.pending(url, worksheet_name) if e[2] == key_column]
+        if not entries or df is None or key_column not in df.columns:
+            return df
+        df = df.copy()
+        positions = {str(k): i for i, k in enumerate(df[key_column])}
+        for _, _, _, row_key, column, value in entries:
+            if row_key in positions and column in df.columns:
+                if df[column].dtype != object:
+                    df[column] = df[column].astype(object)
+                df.iloc[positions[row_key], df.columns.get_loc(column)] = value
+        return df
+
+    # --- Envio ---
+    def flush(self):
+        """Envia todas as edições pendentes (um batch_update por aba)"""
+        with self._flush_lock:
+            with self._connect() as db:
+                rows = db.execute(
+                    "SELECT url, worksheet, key_column, row_key, col, value, seq FROM pending "
+                    "WHERE skipped < ? ORDER BY seq", (MAX_SKIPS,)).fetchall()
+            if not rows:
+                return 0
+
+            started = time.perf_counter()
+            groups = {}
+            for url, worksheet_name, key_column, row_key, column, value, seq in rows:
+                groups.setdefault((url, worksheet_name, key_column), []).append(
+                    (row_key, column, _decode(value), seq))
+
+            done, skipped = [], []
+            for (url, worksheet_name, key_column), entries in groups.items():
+                try:
+                    written = self._flush_tab(url, worksheet_name, key_column, entries)
+                except Exception as e:
+                    self._errors += 1
+                    self._last_error = str(e)
+                    print(f"Erro ao enviar edições pendentes de '{worksheet_name}': {e}")
+                    continue
+                for row_key, column, _, seq in entries:
+                    target = done if (row_key, column) in written else skipped
+                    target.append((url, worksheet_name, key_column, row_key, column, seq))
+                self._cells_flushed += len(written)
+
+            # Remove apenas o que foi escrito e não mudou desde a leitura; as
+            # células não encontradas ficam no journal com a contagem de falhas
+            with self._connect() as db:
+                db.executemany(
+                    "DELETE FROM pending WHERE url=? AND worksheet=? AND key_column=? "
+                    "AND row_key=? AND col=? AND seq=?", done)
+                db.executemany(
+                    "UPDATE pending SET skipped = skipped + 1 WHERE url=? AND worksheet=? AND key_column=? "
+                    "AND row_key=? AND col=? AND seq=?", skipped)
+            for _, worksheet_name, _, row_key, column, _ in skipped:
+                print(f"Edição mantida no journal: '{row_key}'/'{column}' não encontrado em '{worksheet_name}'")
+
+            self._flushes += 1
+            self._latencies.append(time.perf_counter() - started)
+            return len(done)
+
+    def _flush_tab(self, url, worksheet_name, key_column, entries):
+        updates = [(row_key, column, value) for row_key, column, value, _ in entries]
+        written = get_backend(url).update_cells(worksheet_name, updates, key_column)
+        if written is None:
+            raise RuntimeError(f"Aba '{worksheet_name}' indisponível")
+        return {(str(row_key), column) for row_key, column in written}
+
+    # --- Thread de envio ---
+    def start(self):
+        """Inicia a thread de envio (idempotente)"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name="sheets-write-behind", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                # Edições enfileiradas cedem a cota às leituras interativas
+                with background():
+                    self.flush()
+            except Exception as e:
+                self._errors += 1
+                self._last_error = str(e)
+                print(f"Erro na fila de escrita: {e}")
+
+    def stop(self, flush=True):
+        """Para a thread (enviando o que estiver pendente, por padrão)"""
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval + 5)
+        if flush:
+            self.flush()
+
+    # --- Métricas ---
+    def queue_depth(self):
+        """Número de células aguardando envio"""
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def stuck(self):
+        """Células que não foram encontradas na planilha em `MAX_SKIPS` envios"""
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM pending WHERE skipped >= ?", (MAX_SKIPS,)).fetchone()[0]
+
+    def metrics(self):
+        """Profundidade da fila, contadores e latência dos envios"""
+        latencies = list(self._latencies)
+        return {
+            "queue_depth": self.queue_depth(),
+            "stuck": self.stuck(),
+            "enqueued": self._enqueued,
+            "coalesced": self._coalesced,
+            "flushes": self._flushes,
+            "cells_flushed": self._cells_flushed,
+            "errors": self._errors,
+            "last_error": self._last_error,
+            "flush_latency_last": latencies[-1] if latencies else 0.0,
+            "flush_latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "flush_latency_max": max(latencies, default=0.0),
+        }
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Retorna a fila compartilhada do processo, reenviando o journal existente"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteBehindQueue()
+            _queue.start()
+            atexit.register(_queue.stop)
+        return _queue
+
+
+def enqueue_cell_update(url, worksheet_name, row_key, column, value, key_column="key"):
+    """Agenda a atualização da célula (chave, coluna) e retorna imediatamente"""
+    return get_write_queue().enqueue(url, worksheet_name, row_key, column, value, key_column)